@@ -0,0 +1,111 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404
+from rest_framework.response import Response
+
+
+def is_asgi(request):
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterator, chunk_size):
+    # Django под ASGI собирает синхронный итератор StreamingHttpResponse
+    # целиком, поэтому части отдаются по мере чтения в том же потоке,
+    # где открыт курсор.
+    take = sync_to_async(
+        lambda: list(islice(iterator, chunk_size)), thread_sensitive=True
+    )
+    while chunk := await take():
+        for part in chunk:
+            yield part
+
+
+class AsyncReadMixin:
+    def supports_async(self, request):
+        return True
+
+    async def afilter_queryset(self, queryset):
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = await queryset.filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).afirst()
+        if instance is None:
+            raise Http404(
+                f'No {queryset.model._meta.object_name} matches the given '
+                f'query.'
+            )
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    def get_serializer_data(self, *args, **kwargs):
+        return self.get_serializer(*args, **kwargs).data
+
+    async def aget_serializer_data(self, *args, **kwargs):
+        return await sync_to_async(self.get_serializer_data)(*args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(
+                queryset, request, view=self
+            )
+        if page is not None:
+            return self.get_paginated_response(
+                await self.aget_serializer_data(page, many=True)
+            )
+        instances = [instance async for instance in queryset]
+        return Response(
+            await self.aget_serializer_data(instances, many=True)
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aget_serializer_data(instance))
+
+
+def as_async_view(viewset, actions, **initkwargs):
+    actions = {
+        method: action for method, action in actions.items()
+        if hasattr(viewset, action)
+    }
+    if 'get' in actions:
+        actions.setdefault('head', actions['get'])
+    sync_view = sync_to_async(viewset.as_view(actions, **initkwargs))
+
+    async def view(request, *args, **kwargs):
+        action = actions.get(request.method.lower())
+        handler = getattr(viewset, f'a{action}', None)
+        if request.method not in ('GET', 'HEAD') or handler is None:
+            return await sync_view(request, *args, **kwargs)
+        self = viewset(**initkwargs)
+        self.action_map = actions
+        self.args = args
+        self.kwargs = kwargs
+        self.request = request
+        if not self.supports_async(request):
+            return await sync_view(request, *args, **kwargs)
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(self, request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    view.cls = viewset
+    view.initkwargs = initkwargs
+    view.actions = actions
+    view.csrf_exempt = True
+    return view
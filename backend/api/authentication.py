@@ -0,0 +1,117 @@
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_cache_shared():
+    return not isinstance(caches['default'], LOCAL_CACHES)
+
+
+def get_shared_key(key):
+    return f'auth-token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def get_version_key(user_id):
+    return f'auth-token-user:{user_id}'
+
+
+class TokenCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get_version(self, user_id):
+        return cache.get(get_version_key(user_id))
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[3] <= now:
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is None and settings.AUTH_TOKEN_CACHE_SHARED:
+            entry = cache.get(get_shared_key(key))
+            if entry is not None:
+                self.remember(key, entry)
+        if entry is None:
+            return None
+        user, token, version = entry[:3]
+        if self.get_version(user.pk) != version:
+            with self.lock:
+                self.entries.pop(key, None)
+            return None
+        return user, token
+
+    def remember(self, key, entry):
+        with self.lock:
+            self.entries[key] = (
+                *entry, time.monotonic() + settings.AUTH_TOKEN_CACHE_TTL
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_TOKEN_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def set(self, key, user, token):
+        entry = (user, token, self.get_version(user.pk))
+        self.remember(key, entry)
+        if settings.AUTH_TOKEN_CACHE_SHARED:
+            cache.set(
+                get_shared_key(key), entry, settings.AUTH_TOKEN_CACHE_TTL
+            )
+
+    def invalidate(self, user_id, keys=()):
+        cache.set(
+            get_version_key(user_id),
+            uuid.uuid4().hex,
+            settings.AUTH_TOKEN_CACHE_TTL * 2,
+        )
+        with self.lock:
+            for key, entry in list(self.entries.items()):
+                if entry[0].pk == user_id:
+                    del self.entries[key]
+        if settings.AUTH_TOKEN_CACHE_SHARED:
+            cache.delete_many([get_shared_key(key) for key in keys])
+
+    def invalidate_user(self, user_id, keys=()):
+        keys = list(keys)
+        if settings.AUTH_TOKEN_CACHE_SHARED:
+            keys += Token.objects.filter(user_id=user_id).values_list(
+                'key', flat=True
+            )
+        transaction.on_commit(partial(self.invalidate, user_id, keys))
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        # Версии пользователей живут в CACHES['default']: если кэш
+        # не виден другим процессам, выход и блокировка дошли бы до них
+        # только через AUTH_TOKEN_CACHE_TTL, поэтому токен проверяется
+        # по базе на каждый запрос.
+        if not is_cache_shared():
+            return super().authenticate_credentials(key)
+        entry = token_cache.get(key)
+        if entry is None:
+            entry = super().authenticate_credentials(key)
+            token_cache.set(key, *entry)
+        user, token = entry
+        return copy.copy(user), token
@@ -0,0 +1,131 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import Http404
+from rest_framework.response import Response
+
+from recipes.models import CatalogVersion, Ingredient, Tag
+from .conditional import make_etag
+
+
+class CatalogCache:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self._state = (object(), [], {})
+
+    def get_key(self, version):
+        return f'catalog:{self.model._meta.label_lower}:{version}'
+
+    def load(self, version):
+        key = self.get_key(version)
+        items = cache.get(key)
+        if items is None:
+            items = list(
+                self.model.objects.order_by('pk').values(*self.fields)
+            )
+            cache.set(key, items, timeout=None)
+        state = (version, items, {item['id']: item for item in items})
+        self._state = state
+        return state
+
+    def get_state(self, version):
+        state = self._state
+        if state[0] != version:
+            state = self.load(version)
+        return state
+
+    async def aget_state(self, version):
+        state = self._state
+        if state[0] != version:
+            state = await sync_to_async(self.load)(version)
+        return state
+
+    def get_items(self, version):
+        return self.get_state(version)[1]
+
+    def get_item(self, version, pk):
+        return self.get_state(version)[2].get(pk)
+
+
+tag_catalog = CatalogCache(Tag, ('id', 'name', 'slug'))
+ingredient_catalog = CatalogCache(
+    Ingredient, ('id', 'name', 'measurement_unit')
+)
+
+
+class CatalogViewMixin:
+    catalog = None
+    vary_on_user = False
+
+    def get_catalog_version(self):
+        if not hasattr(self, '_catalog_version'):
+            self._catalog_version = CatalogVersion.objects.get_for_model(
+                self.catalog.model
+            )
+        return self._catalog_version
+
+    async def aget_catalog_version(self):
+        if not hasattr(self, '_catalog_version'):
+            self._catalog_version = (
+                await CatalogVersion.objects.aget_for_model(
+                    self.catalog.model
+                )
+            )
+        return self._catalog_version
+
+    def get_cache_validators(self, request):
+        catalog = self.get_catalog_version()
+        if catalog is None:
+            return None, None
+        return (
+            make_etag(catalog.name, catalog.version),
+            int(catalog.updated_at.timestamp()),
+        )
+
+    async def aget_cache_validators(self, request):
+        await self.aget_catalog_version()
+        return self.get_cache_validators(request)
+
+    def list_catalog(self, request, *args, **kwargs):
+        catalog = self.get_catalog_version()
+        if catalog is None:
+            return super().list(request, *args, **kwargs)
+        return Response(self.catalog.get_items(catalog.version))
+
+    async def alist_catalog(self, request, *args, **kwargs):
+        catalog = await self.aget_catalog_version()
+        if catalog is None:
+            return await sync_to_async(self.list_catalog)(
+                request, *args, **kwargs
+            )
+        state = await self.catalog.aget_state(catalog.version)
+        return Response(state[1])
+
+    def get_catalog_pk(self, kwargs):
+        try:
+            return int(kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404
+
+    def retrieve_catalog(self, request, *args, **kwargs):
+        catalog = self.get_catalog_version()
+        if catalog is None:
+            return super().retrieve(request, *args, **kwargs)
+        item = self.catalog.get_item(
+            catalog.version, self.get_catalog_pk(kwargs)
+        )
+        if item is None:
+            raise Http404
+        return Response(item)
+
+    async def aretrieve_catalog(self, request, *args, **kwargs):
+        catalog = await self.aget_catalog_version()
+        if catalog is None:
+            return await sync_to_async(self.retrieve_catalog)(
+                request, *args, **kwargs
+            )
+        state = await self.catalog.aget_state(catalog.version)
+        item = state[2].get(self.get_catalog_pk(kwargs))
+        if item is None:
+            raise Http404
+        return Response(item)
@@ -0,0 +1,54 @@
+from functools import wraps
+from hashlib import sha1
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_digest(*parts):
+    return sha1(repr(parts).encode()).hexdigest()
+
+
+def make_etag(*parts):
+    return quote_etag(make_digest(*parts))
+
+
+def set_cache_validators(view, response, etag, last_modified):
+    if response.status_code in (200, 304):
+        if etag:
+            response.headers['ETag'] = etag
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        if view.vary_on_user:
+            patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def conditional_get(method):
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        etag, last_modified = self.get_cache_validators(request)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if response is None:
+            response = method(self, request, *args, **kwargs)
+        return set_cache_validators(self, response, etag, last_modified)
+    return wrapper
+
+
+def async_conditional_get(method):
+    @wraps(method)
+    async def wrapper(self, request, *args, **kwargs):
+        etag, last_modified = await self.aget_cache_validators(request)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if response is None:
+            response = await method(self, request, *args, **kwargs)
+        return set_cache_validators(self, response, etag, last_modified)
+    return wrapper
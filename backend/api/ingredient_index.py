@@ -0,0 +1,168 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Case, Count, Value, When
+from django.db.models.functions import Lower, Replace
+
+from recipes.models import Ingredient
+
+MAGIC = b'FGINGIX1'
+HEADER = struct.Struct('<8sIII')
+
+
+def normalize(value):
+    return value.lower().replace('ё', 'е')
+
+
+def build_snapshot(path):
+    ingredients = Ingredient.objects.annotate(
+        usage=Count('recipeingredient')
+    ).order_by('-usage', 'name').values('id', 'name', 'measurement_unit')
+
+    names = bytearray(b'\n')
+    name_offsets = array('I')
+    records = bytearray()
+    record_offsets = array('I')
+    for ingredient in ingredients.iterator():
+        name_offsets.append(len(names) - 1)
+        names += normalize(ingredient['name']).encode() + b'\n'
+        record_offsets.append(len(records))
+        records += json.dumps(
+            {
+                'id': ingredient['id'],
+                'name': ingredient['name'],
+                'measurement_unit': ingredient['measurement_unit'],
+            },
+            ensure_ascii=False,
+        ).encode()
+    name_offsets.append(len(names) - 1)
+    record_offsets.append(len(records))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name)
+    with os.fdopen(fd, 'wb') as file:
+        file.write(HEADER.pack(
+            MAGIC,
+            len(record_offsets) - 1,
+            len(names),
+            len(records),
+        ))
+        file.write(name_offsets.tobytes())
+        file.write(names)
+        file.write(record_offsets.tobytes())
+        file.write(records)
+    os.replace(tmp_path, path)
+    return len(record_offsets) - 1
+
+
+def search_database(query):
+    needle = normalize(query)
+    if not needle or '\n' in needle:
+        return []
+    return list(Ingredient.objects.annotate(
+        normalized_name=Replace(Lower('name'), Value('ё'), Value('е')),
+    ).filter(normalized_name__contains=needle).annotate(
+        usage=Count('recipeingredient'),
+        prefix=Case(
+            When(normalized_name__startswith=needle, then=Value(0)),
+            default=Value(1),
+        ),
+    ).order_by('prefix', '-usage', 'name').values(
+        'id', 'name', 'measurement_unit'
+    ))
+
+
+class Snapshot:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.buffer = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        magic, count, names_size, records_size = HEADER.unpack_from(
+            self.buffer
+        )
+        if magic != MAGIC:
+            raise ValueError(f'{path} не является индексом ингредиентов')
+        view = memoryview(self.buffer)
+        offset_size = (count + 1) * array('I').itemsize
+        position = HEADER.size
+        self.name_offsets = view[position:position + offset_size].cast('I')
+        position += offset_size
+        self.names_start = position
+        self.names_end = position + names_size
+        position = self.names_end
+        self.record_offsets = view[
+            position:position + offset_size
+        ].cast('I')
+        self.records_start = position + offset_size
+
+    def _matches(self, needle):
+        start = self.names_start
+        while True:
+            position = self.buffer.find(needle, start, self.names_end)
+            if position == -1:
+                return
+            index = bisect_right(
+                self.name_offsets, position - self.names_start
+            ) - 1
+            yield index
+            start = self.names_start + self.name_offsets[index + 1]
+
+    def record(self, index):
+        start = self.records_start + self.record_offsets[index]
+        end = self.records_start + self.record_offsets[index + 1]
+        return json.loads(self.buffer[start:end])
+
+    def search(self, query):
+        needle = normalize(query).encode()
+        if not needle or b'\n' in needle:
+            return []
+        prefix = list(self._matches(b'\n' + needle))
+        found = set(prefix)
+        substring = [
+            index for index in self._matches(needle)
+            if index not in found
+        ]
+        return [self.record(index) for index in prefix + substring]
+
+
+class IngredientIndex:
+    def __init__(self, path=None):
+        self._path = path
+        self._snapshot = None
+        self._version = None
+
+    @property
+    def path(self):
+        return Path(self._path or settings.INGREDIENT_INDEX_PATH)
+
+    def build(self):
+        return build_snapshot(self.path)
+
+    def get_snapshot(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if version != self._version:
+            self._snapshot = Snapshot(self.path)
+            self._version = version
+        return self._snapshot
+
+    def search(self, query):
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return search_database(query)
+        return snapshot.search(query)
+
+
+ingredient_index = IngredientIndex()
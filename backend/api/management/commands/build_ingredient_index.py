@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.ingredient_index import ingredient_index
+from api.tasks import schedule_ingredient_index
+
+
+class Command(BaseCommand):
+    help = 'Собирает индекс ингредиентов для автодополнения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-schedule',
+            action='store_true',
+            help='Не ставить периодическую пересборку в очередь задач',
+        )
+
+    def handle(self, *args, **options):
+        count = ingredient_index.build()
+        if not options['no_schedule']:
+            schedule_ingredient_index(
+                settings.INGREDIENT_INDEX_REFRESH_INTERVAL
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс ингредиентов собран: {count} записей '
+            f'в {ingredient_index.path}'
+        ))
@@ -0,0 +1,140 @@
+import json
+import sys
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from recipes.models import (
+    FavoriteRecipe,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription
+
+User = get_user_model()
+
+USER_FIELDS = (
+    'id',
+    'email',
+    'username',
+    'first_name',
+    'last_name',
+    'password',
+    'avatar',
+    'is_active',
+    'is_staff',
+    'is_superuser',
+    'date_joined',
+)
+RECIPE_FIELDS = (
+    'id',
+    'author_id',
+    'name',
+    'text',
+    'cooking_time',
+    'image',
+)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает пользователей, рецепты и связи между ними в NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='-',
+            help='Файл для выгрузки, по умолчанию стандартный вывод',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Количество строк, читаемых из базы за раз',
+        )
+
+    def write(self, record_type, record):
+        self.output.write(json.dumps(
+            {'type': record_type, **record},
+            ensure_ascii=False,
+            default=str,
+        ))
+        self.output.write('\n')
+        self.counts[record_type] += 1
+
+    def export_rows(self, record_type, queryset):
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            self.write(record_type, row)
+
+    def export_recipes(self):
+        recipes = Recipe.objects.order_by('pk').values(
+            *RECIPE_FIELDS
+        ).iterator(chunk_size=self.chunk_size)
+        while batch := list(islice(recipes, self.chunk_size)):
+            recipe_ids = [recipe['id'] for recipe in batch]
+            ingredients = defaultdict(list)
+            for row in RecipeIngredient.objects.filter(
+                recipe_id__in=recipe_ids
+            ).order_by('pk').values_list(
+                'recipe_id',
+                'ingredient__name',
+                'ingredient__measurement_unit',
+                'amount',
+            ):
+                ingredients[row[0]].append(list(row[1:]))
+            tags = defaultdict(list)
+            for recipe_id, slug in Recipe.tags.through.objects.filter(
+                recipe_id__in=recipe_ids
+            ).order_by('pk').values_list('recipe_id', 'tag__slug'):
+                tags[recipe_id].append(slug)
+            for recipe in batch:
+                recipe['ingredients'] = ingredients[recipe['id']]
+                recipe['tags'] = tags[recipe['id']]
+                self.write('recipe', recipe)
+
+    def handle(self, *args, **options):
+        self.chunk_size = options['chunk_size']
+        self.counts = defaultdict(int)
+        if options['path'] == '-':
+            self.output = sys.stdout
+            report = self.stderr
+        else:
+            self.output = open(options['path'], 'w', encoding='utf-8')
+            report = self.stdout
+        try:
+            self.export_rows(
+                'user', User.objects.order_by('pk').values(*USER_FIELDS)
+            )
+            self.export_rows(
+                'tag', Tag.objects.order_by('pk').values('name', 'slug')
+            )
+            self.export_recipes()
+            self.export_rows(
+                'subscription',
+                Subscription.objects.order_by('pk').values(
+                    'user_id', 'author_id'
+                ),
+            )
+            self.export_rows(
+                'favorite',
+                FavoriteRecipe.objects.order_by('pk').values(
+                    'user_id', 'recipe_id'
+                ),
+            )
+            self.export_rows(
+                'cart',
+                ShoppingCart.objects.order_by('pk').values(
+                    'user_id', 'recipe_id'
+                ),
+            )
+        finally:
+            if self.output is not sys.stdout:
+                self.output.close()
+        report.write(self.style.SUCCESS('Выгружено: ' + ', '.join(
+            f'{record_type} {count}'
+            for record_type, count in self.counts.items()
+        )))
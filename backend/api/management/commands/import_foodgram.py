@@ -0,0 +1,354 @@
+import json
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.ingredient_index import ingredient_index
+from recipes.models import (
+    CatalogVersion,
+    FavoriteRecipe,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+from users.models import Subscription
+
+User = get_user_model()
+
+ID_MAP_TABLE = 'import_id_map'
+RELATIONS = {
+    'subscription': (Subscription, 'user_id', 'user', 'author_id', 'user'),
+    'favorite': (FavoriteRecipe, 'user_id', 'user', 'recipe_id', 'recipe'),
+    'cart': (ShoppingCart, 'user_id', 'user', 'recipe_id', 'recipe'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает выгрузку export_foodgram с переназначением ключей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='-',
+            help='Файл выгрузки, по умолчанию стандартный ввод',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одном bulk_create',
+        )
+        parser.add_argument(
+            '--on-conflict',
+            choices=('error', 'skip', 'rename'),
+            default='error',
+            help=(
+                'Что делать с пользователями, чьё имя уже занято: '
+                'отменить загрузку и вывести все конфликты, пропустить '
+                'их вместе с рецептами и связями или добавить к имени '
+                'исходный id'
+            ),
+        )
+
+    def remember_ids(self, kind, pairs):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                INSERT INTO {ID_MAP_TABLE} (kind, old_id, new_id)
+                SELECT %s, old_id, new_id
+                FROM unnest(%s::bigint[], %s::bigint[]) AS p(old_id, new_id)
+                ''',
+                [kind, [old for old, _ in pairs], [new for _, new in pairs]],
+            )
+
+    def remap(self, kind, old_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                SELECT old_id, new_id FROM {ID_MAP_TABLE}
+                WHERE kind = %s AND old_id = ANY(%s::bigint[])
+                ''',
+                [kind, list(set(old_ids))],
+            )
+            return dict(cursor.fetchall())
+
+    def acquire_files(self, names):
+        for name, count in Counter(filter(None, names)).items():
+            default_storage.acquire(name, count)
+
+    def free_username(self, record, taken):
+        max_length = User._meta.get_field('username').max_length
+        suffix = f'-{record["id"]}'
+        number = 1
+        while True:
+            username = record['username'][:max_length - len(suffix)] + suffix
+            if username not in taken and not User.objects.filter(
+                username=username
+            ).exists():
+                return username
+            number += 1
+            suffix = f'-{record["id"]}-{number}'
+
+    def resolve_conflicts(self, records):
+        taken = set(User.objects.filter(
+            username__in=[record['username'] for record in records]
+        ).values_list('username', flat=True))
+        resolved = []
+        for record in records:
+            if record['username'] in taken:
+                self.conflicts.append(
+                    f'пользователь {record["id"]} ({record["email"]}): '
+                    f'имя {record["username"]} уже занято'
+                )
+                if self.on_conflict != 'rename':
+                    continue
+                record = dict(
+                    record, username=self.free_username(record, taken)
+                )
+            taken.add(record['username'])
+            resolved.append(record)
+        return resolved
+
+    def import_users(self, batch):
+        existing = dict(User.objects.filter(
+            email__in=[record['email'] for record in batch]
+        ).values_list('email', 'pk'))
+        pairs = [
+            (record['id'], existing[record['email']])
+            for record in batch if record['email'] in existing
+        ]
+        new_records, duplicates = {}, []
+        for record in batch:
+            if record['email'] in existing:
+                continue
+            if record['email'] in new_records:
+                duplicates.append(record)
+            else:
+                new_records[record['email']] = record
+        new_records = self.resolve_conflicts(list(new_records.values()))
+        users = User.objects.bulk_create([
+            User(
+                email=record['email'],
+                username=record['username'],
+                first_name=record['first_name'],
+                last_name=record['last_name'],
+                password=record['password'],
+                avatar=record['avatar'] or None,
+                is_active=record['is_active'],
+                is_staff=record['is_staff'],
+                is_superuser=record['is_superuser'],
+                date_joined=datetime.fromisoformat(record['date_joined']),
+            )
+            for record in new_records
+        ])
+        self.acquire_files(record['avatar'] for record in new_records)
+        created = {
+            record['email']: user.pk
+            for record, user in zip(new_records, users)
+        }
+        pairs += [
+            (record['id'], created[record['email']])
+            for record in [*new_records, *duplicates]
+            if record['email'] in created
+        ]
+        self.remember_ids('user', pairs)
+
+    def import_tags(self, batch):
+        existing = set(Tag.objects.filter(
+            slug__in=[record['slug'] for record in batch]
+        ).values_list('slug', flat=True))
+        missing = [
+            Tag(name=record['name'], slug=record['slug'])
+            for record in batch if record['slug'] not in existing
+        ]
+        if missing:
+            Tag.objects.bulk_create(missing, ignore_conflicts=True)
+            self.catalogs_changed.add(Tag)
+
+    def get_ingredient_ids(self, batch):
+        units = {
+            name: unit
+            for record in batch
+            for name, unit, _ in record['ingredients']
+        }
+        ingredient_ids = dict(Ingredient.objects.filter(
+            name__in=units
+        ).values_list('name', 'pk'))
+        missing = [
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in units.items() if name not in ingredient_ids
+        ]
+        if missing:
+            Ingredient.objects.bulk_create(missing, ignore_conflicts=True)
+            self.catalogs_changed.add(Ingredient)
+            ingredient_ids.update(Ingredient.objects.filter(
+                name__in=[ingredient.name for ingredient in missing]
+            ).values_list('name', 'pk'))
+        return ingredient_ids
+
+    def import_recipes(self, batch):
+        authors = self.remap('user', [record['author_id'] for record in batch])
+        batch = [record for record in batch if record['author_id'] in authors]
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author_id=authors[record['author_id']],
+                name=record['name'],
+                text=record['text'],
+                cooking_time=record['cooking_time'],
+                image=record['image'],
+            )
+            for record in batch
+        ])
+        self.acquire_files(record['image'] for record in batch)
+        self.remember_ids('recipe', [
+            (record['id'], recipe.pk)
+            for record, recipe in zip(batch, recipes)
+        ])
+
+        ingredient_ids = self.get_ingredient_ids(batch)
+        tag_ids = dict(Tag.objects.filter(slug__in={
+            slug for record in batch for slug in record['tags']
+        }).values_list('slug', 'pk'))
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient_ids[name],
+                amount=amount,
+            )
+            for record, recipe in zip(batch, recipes)
+            for name, _, amount in record['ingredients']
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag_id=tag_ids[slug])
+            for record, recipe in zip(batch, recipes)
+            for slug in record['tags'] if slug in tag_ids
+        ], ignore_conflicts=True)
+
+        recipe_ids = [recipe.pk for recipe in recipes]
+        Recipe.objects.filter(pk__in=recipe_ids).update_search_vector()
+        User.objects.filter(pk__in=set(authors.values())).update(
+            recipes_count=Coalesce(Subquery(
+                Recipe.objects.filter(author=OuterRef('pk')).values(
+                    'author'
+                ).annotate(count=Count('pk')).values('count')
+            ), 0)
+        )
+
+    def import_relation(self, record_type, batch):
+        model, first, first_kind, second, second_kind = RELATIONS[record_type]
+        first_ids = self.remap(first_kind, [record[first] for record in batch])
+        second_ids = self.remap(
+            second_kind, [record[second] for record in batch]
+        )
+        model.objects.bulk_create([
+            model(**{
+                first: first_ids[record[first]],
+                second: second_ids[record[second]],
+            })
+            for record in batch
+            if record[first] in first_ids and record[second] in second_ids
+        ], ignore_conflicts=True)
+
+    def flush(self, record_type, batch):
+        self.counts[record_type] += len(batch)
+        if record_type == 'user':
+            self.import_users(batch)
+        elif record_type == 'tag':
+            self.import_tags(batch)
+        elif record_type == 'recipe':
+            self.import_recipes(batch)
+        elif record_type in RELATIONS:
+            self.import_relation(record_type, batch)
+        else:
+            raise CommandError(f'Неизвестный тип записи: {record_type}')
+
+    def read(self, file):
+        batch_type, batch = None, []
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                record_type = record.pop('type')
+            except (ValueError, KeyError):
+                raise CommandError(f'Строка {line_number}: неверная запись')
+            if batch and (
+                record_type != batch_type or len(batch) >= self.batch_size
+            ):
+                self.flush(batch_type, batch)
+                batch = []
+            batch_type = record_type
+            batch.append(record)
+        if batch:
+            self.flush(batch_type, batch)
+
+    def finish(self):
+        Recipe.objects.sync_favorites_count()
+        ShoppingListItem.objects.rebuild()
+        for model in self.catalogs_changed:
+            CatalogVersion.objects.bump(model)
+        if Ingredient in self.catalogs_changed or self.counts['recipe']:
+            transaction.on_commit(ingredient_index.build)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.on_conflict = options['on_conflict']
+        self.conflicts = []
+        self.counts = defaultdict(int)
+        self.catalogs_changed = set()
+        if options['path'] == '-':
+            file = sys.stdin
+        else:
+            try:
+                file = open(options['path'], encoding='utf-8')
+            except FileNotFoundError:
+                raise CommandError(f'Файл {options["path"]} не найден')
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'''
+                        CREATE TEMPORARY TABLE {ID_MAP_TABLE} (
+                            kind varchar(16) NOT NULL,
+                            old_id bigint NOT NULL,
+                            new_id bigint NOT NULL,
+                            PRIMARY KEY (kind, old_id)
+                        ) ON COMMIT DROP
+                        '''
+                    )
+                self.read(file)
+                if self.conflicts and self.on_conflict == 'error':
+                    raise CommandError(
+                        'Загрузка отменена, конфликты пользователей:\n'
+                        + '\n'.join(self.conflicts)
+                        + '\nЗапустите с --on-conflict=skip или rename'
+                    )
+                self.finish()
+        except DatabaseError as error:
+            raise CommandError(f'Не удалось загрузить данные: {error}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        summary = ', '.join(
+            f'{record_type} {count}'
+            for record_type, count in self.counts.items()
+        )
+        action = {'skip': 'пропущен', 'rename': 'переименован'}.get(
+            self.on_conflict
+        )
+        for conflict in self.conflicts:
+            self.stderr.write(f'{conflict}, {action}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано записей: {summary}'
+        ))
@@ -0,0 +1,206 @@
+import csv
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+from api.ingredient_index import ingredient_index
+from recipes.models import CatalogVersion, Ingredient, Recipe
+
+STAGING_TABLE = 'ingredient_staging'
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_MAX_RECORD_SIZE = 1024 * 1024
+JSON_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(file, chunk_size=JSON_CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+    state, number = 'start', 0
+    while True:
+        while position < len(buffer) and buffer[position] in JSON_WHITESPACE:
+            position += 1
+        if position == len(buffer) and not eof:
+            chunk = file.read(chunk_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            continue
+        if position == len(buffer):
+            if state == 'end':
+                return
+            raise ValueError(f'запись {number + 1}: файл оборвался')
+        char = buffer[position]
+        if state == 'end':
+            raise ValueError('лишние данные после массива')
+        if state == 'start':
+            if char != '[':
+                raise ValueError('ожидался массив записей')
+            position += 1
+            state = 'first'
+        elif char == ']' and state in ('first', 'separator'):
+            position += 1
+            state = 'end'
+        elif state == 'separator':
+            if char != ',':
+                raise ValueError(f'запись {number}: ожидалась запятая')
+            position += 1
+            state = 'item'
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if eof or len(buffer) - position > JSON_MAX_RECORD_SIZE:
+                    raise ValueError(f'запись {number + 1}: {error.msg}')
+                end = len(buffer)
+            if end == len(buffer) and not eof:
+                chunk = file.read(chunk_size)
+                buffer, position, eof = (
+                    buffer[position:] + chunk, 0, not chunk
+                )
+                continue
+            number += 1
+            yield item
+            position = end
+            state = 'separator'
+
+
+class Command(BaseCommand):
+    help = 'Загружает справочник ингредиентов из CSV или JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Путь к файлу с ингредиентами',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'json'),
+            help='Формат файла, по умолчанию определяется по расширению',
+        )
+
+    def read_csv(self, file):
+        for line, row in enumerate(csv.reader(file), start=1):
+            if not row:
+                continue
+            if len(row) != 2:
+                raise CommandError(
+                    f'Строка {line}: ожидалось 2 столбца, получено {len(row)}'
+                )
+            yield row
+
+    def read_json(self, file):
+        try:
+            for number, item in enumerate(iter_json_array(file), start=1):
+                try:
+                    row = item['name'], item['measurement_unit']
+                except (KeyError, TypeError):
+                    raise CommandError(
+                        f'Запись {number}: нужны поля name и measurement_unit'
+                    )
+                if not all(isinstance(value, str) for value in row):
+                    raise CommandError(
+                        f'Запись {number}: name и measurement_unit '
+                        'должны быть строками'
+                    )
+                yield row
+        except ValueError as error:
+            raise CommandError(f'Ошибка декодирования JSON: {error}')
+
+    def write_staging_file(self, path, file_format):
+        staging = tempfile.SpooledTemporaryFile(
+            max_size=16 * 1024 * 1024, mode='w+', encoding='utf-8'
+        )
+        reader = self.read_csv if file_format == 'csv' else self.read_json
+        writer = csv.writer(staging)
+        total = 0
+        with open(path, encoding='utf-8', newline='') as file:
+            for name, measurement_unit in reader(file):
+                writer.writerow((name.strip(), measurement_unit.strip()))
+                total += 1
+        staging.seek(0)
+        return staging, total
+
+    def load(self, cursor, staging):
+        ingredients = Ingredient._meta.db_table
+        cursor.execute(
+            f'''
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                name varchar(255) NOT NULL,
+                measurement_unit varchar(255) NOT NULL
+            ) ON COMMIT DROP
+            '''
+        )
+        cursor.copy_expert(
+            f'COPY {STAGING_TABLE} (name, measurement_unit) '
+            'FROM STDIN WITH (FORMAT csv)',
+            staging,
+        )
+        cursor.execute(
+            f'''
+            CREATE TEMPORARY TABLE {STAGING_TABLE}_unique ON COMMIT DROP AS
+            SELECT DISTINCT ON (name) name, measurement_unit
+            FROM {STAGING_TABLE}
+            ORDER BY name
+            '''
+        )
+        cursor.execute(
+            f'''
+            SELECT COUNT(*)
+            FROM {STAGING_TABLE}_unique AS s
+            JOIN {ingredients} AS i ON i.name = s.name
+            WHERE i.measurement_unit = s.measurement_unit
+            '''
+        )
+        unchanged = cursor.fetchone()[0]
+        cursor.execute(
+            f'''
+            UPDATE {ingredients} AS i
+            SET measurement_unit = s.measurement_unit
+            FROM {STAGING_TABLE}_unique AS s
+            WHERE i.name = s.name
+            AND i.measurement_unit <> s.measurement_unit
+            RETURNING i.id
+            '''
+        )
+        updated = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            f'''
+            INSERT INTO {ingredients} (name, measurement_unit)
+            SELECT s.name, s.measurement_unit
+            FROM {STAGING_TABLE}_unique AS s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {ingredients} AS i WHERE i.name = s.name
+            )
+            '''
+        )
+        return cursor.rowcount, updated, unchanged
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f'Файл {path} не найден')
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'json'):
+            raise CommandError(
+                'Не удалось определить формат файла, укажите --format'
+            )
+
+        staging, total = self.write_staging_file(path, file_format)
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                inserted, updated, unchanged = self.load(cursor, staging)
+                if updated:
+                    Recipe.objects.filter(ingredients__in=updated).touch()
+                if inserted or updated:
+                    CatalogVersion.objects.bump(Ingredient)
+                    transaction.on_commit(ingredient_index.build)
+        except DatabaseError as error:
+            raise CommandError(f'Не удалось загрузить ингредиенты: {error}')
+        finally:
+            staging.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано строк: {total}, добавлено: {inserted}, '
+            f'обновлено: {len(updated)}, без изменений: {unchanged}'
+        ))
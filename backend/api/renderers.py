@@ -0,0 +1,120 @@
+import csv
+from io import BytesIO
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+SHOPPING_LIST_HEADER = ('Ингредиент', 'Количество', 'Единица измерения')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not data:
+            return b''
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode(self.charset)
+
+    def stream(self, rows):
+        raise NotImplementedError
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(SHOPPING_LIST_HEADER)
+        for row in rows:
+            yield writer.writerow([
+                row['ingredient_name'],
+                row['total_amount'],
+                row['measurement_unit'],
+            ])
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        yield 'Список покупок\n\n'
+        for row in rows:
+            yield (
+                f'• {row["ingredient_name"]} — '
+                f'{row["total_amount"]} {row["measurement_unit"]}\n'
+            )
+
+
+class ShoppingListPDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    font_name = 'ShoppingListFont'
+    font_size = 12
+    line_height = 18
+    margin = 50
+
+    def get_canvas(self, buffer):
+        if self.font_name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(
+                TTFont(self.font_name, settings.SHOPPING_LIST_FONT)
+            )
+        return Canvas(buffer, pagesize=A4)
+
+    def stream(self, rows):
+        buffer = BytesIO()
+        canvas = self.get_canvas(buffer)
+        width, height = A4
+        canvas.setTitle('Список покупок')
+        canvas.setFont(self.font_name, self.font_size + 4)
+        position = height - self.margin
+        canvas.drawString(self.margin, position, 'Список покупок')
+        position -= self.line_height * 2
+        canvas.setFont(self.font_name, self.font_size)
+        for row in rows:
+            if position < self.margin:
+                canvas.showPage()
+                canvas.setFont(self.font_name, self.font_size)
+                position = height - self.margin
+            canvas.drawString(
+                self.margin,
+                position,
+                f'□ {row["ingredient_name"]}',
+            )
+            canvas.drawRightString(
+                width - self.margin,
+                position,
+                f'{row["total_amount"]} {row["measurement_unit"]}',
+            )
+            position -= self.line_height
+        canvas.save()
+        yield buffer.getvalue()
+
+
+class ShoppingListContentNegotiation(DefaultContentNegotiation):
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+
+SHOPPING_LIST_RENDERERS = [
+    ShoppingListCSVRenderer,
+    ShoppingListTextRenderer,
+    ShoppingListPDFRenderer,
+]
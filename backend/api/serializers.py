@@ -1,21 +1,29 @@
-import uuid
 import base64
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from core.constants import (
     MINIMUM_VALUES,
     MAXIMUM_VALUES,
+    RECIPE_FRAGMENT_TIMEOUT,
 )
 from recipes.models import (
     Recipe,
     Tag,
     Ingredient,
     RecipeIngredient,
+    ShoppingListItem,
+    prefetch_recipe_relations,
 )
+from users.tasks import process_avatar
+from .catalog import tag_catalog
+from .conditional import make_digest
 
 
 User = get_user_model()
@@ -26,15 +34,30 @@ class Base64ImageField(serializers.ImageField):
         if isinstance(data, str) and data.startswith('data:image'):
             header, base64_data = data.split(';base64,')
             extension = header.split('/')[-1]
-            unique_name = f'{uuid.uuid4()}.{extension}'
             decoded_file = ContentFile(
                 base64.b64decode(base64_data),
-                name=unique_name
+                name=f'image.{extension}'
             )
             data = decoded_file
         return super().to_internal_value(data)
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        request = self.context.get('request')
+        variants = {}
+        for name, formats in value.items():
+            if name == 'source':
+                continue
+            variants[name] = {}
+            for extension, path in formats.items():
+                url = default_storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                variants[name][extension] = url
+        return variants
+
+
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
@@ -55,6 +78,8 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         current_user = self.context['request'].user
         if current_user.is_authenticated:
             return current_user.subscription_user.filter(
@@ -83,7 +108,23 @@ class IngredientSerializer(serializers.ModelSerializer):
         )
 
 
+class CatalogTagsField(serializers.ReadOnlyField):
+    def __init__(self, **kwargs):
+        super().__init__(source='*', **kwargs)
+
+    def to_representation(self, recipe):
+        if getattr(recipe, 'tags_version', None) is None:
+            return TagSerializer(recipe.tags.all(), many=True).data
+        tags = (
+            tag_catalog.get_item(recipe.tags_version, pk)
+            for pk in recipe.tag_ids
+        )
+        return [tag for tag in tags if tag is not None]
+
+
 class RecipeFavouriteSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Recipe
         fields = (
@@ -91,14 +132,12 @@ class RecipeFavouriteSerializer(serializers.ModelSerializer):
             'name',
             'cooking_time',
             'image',
+            'image_variants',
         )
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-        source='ingredient',
-    )
+    id = serializers.IntegerField(source='ingredient_id')
     name = serializers.CharField(
         source='ingredient.name',
         read_only=True,
@@ -122,15 +161,57 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         )
 
 
+class ShoppingListItemSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='ingredient.id')
+    name = serializers.CharField(source='ingredient.name')
+    measurement_unit = serializers.CharField(
+        source='ingredient.measurement_unit',
+    )
+
+    class Meta:
+        model = ShoppingListItem
+        fields = (
+            'id',
+            'name',
+            'measurement_unit',
+            'amount',
+        )
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        recipes = list(data.all() if hasattr(data, 'all') else data)
+        keys = [self.child.get_fragment_key(recipe) for recipe in recipes]
+        fragments = cache.get_many(keys)
+        missing = [
+            recipe for recipe, key in zip(recipes, keys)
+            if key not in fragments
+        ]
+        if missing:
+            prefetch_recipe_relations(missing)
+            built = {
+                self.child.get_fragment_key(recipe):
+                    self.child.build_fragment(recipe)
+                for recipe in missing
+            }
+            cache.set_many(built, RECIPE_FRAGMENT_TIMEOUT)
+            fragments.update(built)
+        return [
+            self.child.merge_viewer_fields(fragments[key], recipe)
+            for recipe, key in zip(recipes, keys)
+        ]
+
+
 class RecipeSerializer(serializers.ModelSerializer):
-    tags = TagSerializer(many=True, read_only=True)
+    tags = CatalogTagsField()
     ingredients = RecipeIngredientSerializer(
         source='recipeingredient_set',
         many=True
     )
     author = UserSerializer(read_only=True)
-    is_favorited = serializers.SerializerMethodField(read_only=True)
-    is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    image_variants = ImageVariantsField()
+    is_favorited = serializers.BooleanField(read_only=True)
+    is_in_shopping_cart = serializers.BooleanField(read_only=True)
     cooking_time = serializers.IntegerField(
         min_value=MINIMUM_VALUES,
         max_value=MAXIMUM_VALUES,
@@ -147,27 +228,54 @@ class RecipeSerializer(serializers.ModelSerializer):
             'ingredients',
             'author',
             'image',
+            'image_variants',
             'is_favorited',
             'is_in_shopping_cart',
+            'favorites_count',
         )
+        read_only_fields = (
+            'favorites_count',
+        )
+        list_serializer_class = RecipeListSerializer
 
-    def get_is_favorited(self, obj):
-        author = self.context['request'].user
-        return (
-            author.is_authenticated
-            and author.favorited_by.filter(
-                recipe=obj
-            ).exists()
+    def get_fragment_key(self, recipe):
+        author = recipe.author
+        request = self.context.get('request')
+        version = make_digest(
+            recipe.updated_at,
+            getattr(recipe, 'tags_version', None),
+            author.email,
+            author.username,
+            author.first_name,
+            author.last_name,
+            author.avatar.name,
+            request.build_absolute_uri('/') if request else None,
         )
+        return f'recipe:{recipe.pk}:{version}'
 
-    def get_is_in_shopping_cart(self, obj):
-        author = self.context['request'].user
-        return (
-            author.is_authenticated
-            and author.shopping_cart.filter(
-                recipe=obj
-            ).exists()
+    def build_fragment(self, recipe):
+        recipe.author.is_subscribed = recipe.author_is_subscribed
+        return super().to_representation(recipe)
+
+    def merge_viewer_fields(self, fragment, recipe):
+        data = dict(fragment)
+        data['author'] = dict(
+            fragment['author'],
+            is_subscribed=recipe.author_is_subscribed,
         )
+        data['is_favorited'] = recipe.is_favorited
+        data['is_in_shopping_cart'] = recipe.is_in_shopping_cart
+        data['favorites_count'] = recipe.favorites_count
+        return data
+
+    def to_representation(self, instance):
+        key = self.get_fragment_key(instance)
+        fragment = cache.get(key)
+        if fragment is None:
+            prefetch_recipe_relations([instance])
+            fragment = self.build_fragment(instance)
+            cache.set(key, fragment, RECIPE_FRAGMENT_TIMEOUT)
+        return self.merge_viewer_fields(fragment, instance)
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -185,8 +293,8 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         min_value=MINIMUM_VALUES,
         max_value=MAXIMUM_VALUES,
     )
-    is_favorited = serializers.SerializerMethodField(read_only=True)
-    is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    is_favorited = serializers.BooleanField(read_only=True)
+    is_in_shopping_cart = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -222,11 +330,20 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             )
 
     def _validate_ingredients(self, ingredients):
-        ingredient_ids = {ing['ingredient'].id for ing in ingredients}
+        ingredient_ids = {ing['ingredient_id'] for ing in ingredients}
         if len(ingredients) != len(ingredient_ids):
             raise ValidationError(
                 {'ingredients': 'Ингредиенты не должны повторяться'}
             )
+        missing = ingredient_ids - set(
+            Ingredient.objects.filter(
+                pk__in=ingredient_ids
+            ).values_list('pk', flat=True)
+        )
+        if missing:
+            raise ValidationError(
+                {'ingredients': f'Ингредиенты не найдены: {sorted(missing)}'}
+            )
 
     def _validate_image(self, image):
         if not image:
@@ -242,15 +359,13 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     def handle_ingredients(self, recipe, ingredients_data):
         recipe.ingredients.clear()
         ingredients_to_create = [
-            RecipeIngredient(
-                recipe=recipe,
-                ingredient=data.pop('ingredient'),
-                **data
-            )
+            RecipeIngredient(recipe=recipe, **data)
             for data in ingredients_data
         ]
         RecipeIngredient.objects.bulk_create(ingredients_to_create)
+        Recipe.objects.filter(pk=recipe.pk).update_search_vector()
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = self.validate_ingredients(
             validated_data.pop('recipeingredient_set', [])
@@ -262,6 +377,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         self.handle_ingredients(recipe, ingredients_data)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = self.validate_ingredients(
             validated_data.pop('recipeingredient_set', [])
@@ -269,31 +385,22 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         tags_data = validated_data.pop('tags', [])
         instance = super().update(instance, validated_data)
         instance.tags.set(tags_data)
+        ShoppingListItem.objects.remove_recipe(instance)
         self.handle_ingredients(instance, ingredients_data)
+        ShoppingListItem.objects.add_recipe(instance)
         return instance
 
-    def get_is_favorited(self, obj):
-        author = self.context['request'].user
-        return (
-            author.is_authenticated
-            and author.favorited_by.filter(
-                recipe=obj
-            ).exists()
-        )
-
-    def get_is_in_shopping_cart(self, obj):
-        author = self.context['request'].user
-        return (
-            author.is_authenticated
-            and author.shopping_cart.filter(
-                recipe=obj
-            ).exists()
-        )
-
     def to_representation(self, instance):
+        instance = Recipe.objects.for_reading(
+            self.context['request'].user
+        ).get(pk=instance.pk)
         return RecipeSerializer(instance, context=self.context).data
 
 
+class RecipesLimitSerializer(serializers.Serializer):
+    recipes_limit = serializers.IntegerField(min_value=0, required=False)
+
+
 class SubscribeSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
@@ -316,6 +423,8 @@ class SubscribeSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context['request'].user
         return user.is_authenticated and user.subscription_user.filter(
             author=obj
@@ -336,17 +445,8 @@ class SubscribeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Подписка не найдена')
 
     def get_recipes(self, obj):
-        recipes = obj.recipes.all()
-        request = self.context.get('request')
-        if request:
-            recipes_limit = request.query_params.get('recipes_limit')
-            if recipes_limit is not None:
-                recipes_limit = int(recipes_limit)
-                recipes = recipes[:recipes_limit]
-            else:
-                recipes_limit = None
         return RecipeFavouriteSerializer(
-            recipes,
+            obj.limited_recipes,
             many=True,
             context=self.context
         ).data
@@ -397,12 +497,17 @@ class AvatarSerializer(serializers.Serializer):
                 'Ошибка при обработке изображения'
             )
 
+    @transaction.atomic
     def save(self, **kwargs):
-        user = self.context['request'].user
+        user = User.objects.select_for_update().get(
+            pk=self.context['request'].user.pk
+        )
         user.avatar.save(
             self.validated_data['avatar'].name,
-            self.validated_data['avatar'], save=True
+            self.validated_data['avatar'], save=False
         )
+        user.save(update_fields=['avatar'])
+        process_avatar.enqueue(user_id=user.pk, name=user.avatar.name)
         return user.avatar.url
 
 
@@ -421,4 +526,4 @@ class PasswordSerializer(serializers.Serializer):
     def save(self, **kwargs):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient
+from .authentication import token_cache
+from .tasks import schedule_ingredient_index
+
+User = get_user_model()
+
+AUTH_FIELDS = ('password', 'is_active')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def rebuild_ingredient_index(sender, **kwargs):
+    schedule_ingredient_index()
+
+
+def get_auth_state(user):
+    return tuple(user.__dict__.get(field) for field in AUTH_FIELDS)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.user_id, [instance.key])
+
+
+@receiver(post_init, sender=User)
+def remember_auth_state(sender, instance, **kwargs):
+    instance._auth_state = get_auth_state(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields,
+                           **kwargs):
+    if created or update_fields and not set(update_fields) & set(
+        AUTH_FIELDS
+    ):
+        return
+    state = get_auth_state(instance)
+    if state != instance._auth_state:
+        instance._auth_state = state
+        token_cache.invalidate_user(instance.pk)
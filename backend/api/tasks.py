@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import task
+from .ingredient_index import ingredient_index
+
+
+@task('api.build_ingredient_index')
+def build_ingredient_index():
+    schedule_ingredient_index(settings.INGREDIENT_INDEX_REFRESH_INTERVAL)
+    ingredient_index.build()
+
+
+def schedule_ingredient_index(delay=0):
+    run_at = timezone.now() + timedelta(seconds=delay)
+    queued = Job.objects.filter(
+        name='api.build_ingredient_index', status=Job.QUEUED
+    )
+    if not queued.update(run_at=Least('run_at', Value(run_at))):
+        build_ingredient_index.enqueue(run_at=run_at)
@@ -0,0 +1,170 @@
+import shutil
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from metrics.registry import registry
+from recipes.models import (
+    CatalogVersion,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    INGREDIENT_INDEX_PATH=f'{MEDIA_ROOT}/ingredient_index.bin',
+    METRICS_DIR=f'{MEDIA_ROOT}/metrics',
+    NPLUSONE_MODE='strict',
+)
+class AsyncViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = Tag.objects.bulk_create([
+            Tag(name=f'Тэг {number}', slug=f'tag-{number}')
+            for number in range(2)
+        ])
+        cls.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(5)
+        ])
+        cls.author = User.objects.create_user(
+            email='author@foodgram.local',
+            username='author',
+            first_name='Автор',
+            last_name='Автор',
+            password='password',
+        )
+        cls.token = Token.objects.create(user=cls.author).key
+        cls.recipes = []
+        for number in range(8):
+            recipe = Recipe.objects.create(
+                author=cls.author,
+                name=f'Рецепт {number}',
+                image='recipes_images/test.png',
+                text='Описание',
+                cooking_time=10 + number,
+            )
+            recipe.tags.set(cls.tags[:1 + number % 2])
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=cls.ingredients[number % 5],
+                amount=100,
+            )
+            cls.recipes.append(recipe)
+        CatalogVersion.objects.bump(Tag)
+        CatalogVersion.objects.bump(Ingredient)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    async def get_both(self, url, **headers):
+        sync_response = await self.async_client.get(url, headers=headers)
+        with self.settings(ROOT_URLCONF='foodgram.asgi_urls'):
+            async_response = await self.async_client.get(
+                url, headers=headers
+            )
+        return sync_response, async_response
+
+    async def test_responses_match_sync_views(self):
+        urls = [
+            '/api/recipes/',
+            '/api/recipes/?limit=3&page=2',
+            '/api/recipes/?tags=tag-1',
+            '/api/recipes/?page=99',
+            f'/api/recipes/{self.recipes[0].pk}/',
+            '/api/recipes/999999/',
+            '/api/tags/',
+            f'/api/tags/{self.tags[0].pk}/',
+            '/api/ingredients/',
+            '/api/ingredients/?name=ингр',
+            f'/api/ingredients/{self.ingredients[0].pk}/',
+        ]
+        for url in urls:
+            for headers in ({}, {'Authorization': f'Token {self.token}'}):
+                with self.subTest(url=url, headers=headers):
+                    expected, response = await self.get_both(url, **headers)
+                    self.assertEqual(
+                        response.status_code, expected.status_code
+                    )
+                    self.assertEqual(response.content, expected.content)
+                    self.assertEqual(
+                        response.get('ETag'), expected.get('ETag')
+                    )
+
+    async def test_conditional_get(self):
+        url = f'/api/recipes/{self.recipes[0].pk}/'
+        with self.settings(ROOT_URLCONF='foodgram.asgi_urls'):
+            response = await self.async_client.get(url)
+            response = await self.async_client.get(
+                url, headers={'If-None-Match': response['ETag']}
+            )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_writes_use_sync_views(self):
+        url = f'/api/recipes/{self.recipes[0].pk}/'
+        with self.settings(ROOT_URLCONF='foodgram.asgi_urls'):
+            response = await self.async_client.delete(url)
+            self.assertEqual(response.status_code, 401)
+            response = await self.async_client.delete(
+                url, headers={'Authorization': f'Token {self.token}'}
+            )
+        self.assertEqual(response.status_code, 204)
+
+    def recorded_queries(self, view):
+        labels = (('view', view), ('method', 'GET'))
+        series = registry.collect().get(('foodgram_db_queries', labels))
+        return series[-1] if series else 0
+
+    async def test_queries_are_counted(self):
+        for url, view in (
+            ('/api/recipes/', 'RecipeViewSet.list'),
+            (f'/api/recipes/{self.recipes[0].pk}/', 'RecipeViewSet.retrieve'),
+        ):
+            with self.subTest(url=url):
+                before = await sync_to_async(self.recorded_queries)(view)
+                sync_response = await self.async_client.get(url)
+                sync_queries = await sync_to_async(self.recorded_queries)(
+                    view
+                )
+                with self.settings(ROOT_URLCONF='foodgram.asgi_urls'):
+                    response = await self.async_client.get(url)
+                after = await sync_to_async(self.recorded_queries)(view)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(sync_response.status_code, 200)
+                self.assertGreater(sync_queries - before, 0)
+                self.assertGreater(after - sync_queries, 0)
+
+    async def test_shopping_cart_is_streamed_asynchronously(self):
+        await ShoppingCart.objects.abulk_create([
+            ShoppingCart(user=self.author, recipe=recipe)
+            for recipe in self.recipes[:3]
+        ])
+        await sync_to_async(ShoppingListItem.objects.rebuild)()
+        response = await self.async_client.get(
+            '/api/recipes/download_shopping_cart/?format=txt',
+            headers={'Authorization': f'Token {self.token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([
+            part async for part in response.streaming_content
+        ]).decode()
+        for ingredient in self.ingredients[:3]:
+            self.assertIn(f'{ingredient.name} — 100 г', content)
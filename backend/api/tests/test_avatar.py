@@ -0,0 +1,85 @@
+import base64
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from blobs.models import Blob
+from jobs.models import Job
+from users.tasks import process_avatar
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_data(color):
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), color).save(buffer, 'PNG')
+    return (
+        'data:image/png;base64,'
+        + base64.b64encode(buffer.getvalue()).decode()
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class AvatarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@foodgram.local',
+            username='user',
+            first_name='Пользователь',
+            last_name='Пользователь',
+            password='password',
+        )
+        cls.token = Token.objects.create(user=cls.user).key
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.headers = {'Authorization': f'Token {self.token}'}
+
+    def request(self, method, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(
+                '/api/users/me/avatar/',
+                data,
+                content_type='application/json',
+                headers=self.headers,
+            )
+
+    def run_jobs(self):
+        for job in Job.objects.filter(name='users.process_avatar'):
+            with self.captureOnCommitCallbacks(execute=True):
+                process_avatar(**job.payload)
+            job.delete()
+
+    def blobs(self):
+        return dict(Blob.objects.values_list('name', 'references_count'))
+
+    def test_replacing_processed_avatar_releases_it(self):
+        self.assertEqual(
+            self.request('put', {'avatar': image_data('red')}).status_code,
+            200,
+        )
+        self.run_jobs()
+        processed = User.objects.get(pk=self.user.pk).avatar.name
+        self.assertEqual(self.blobs(), {processed: 1})
+
+        self.request('put', {'avatar': image_data('blue')})
+        uploaded = User.objects.get(pk=self.user.pk).avatar.name
+        self.assertEqual(self.blobs(), {uploaded: 1})
+
+        self.assertEqual(self.request('delete').status_code, 204)
+        self.assertEqual(self.blobs(), {})
+        self.assertFalse(User.objects.get(pk=self.user.pk).avatar)
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.ingredient_index import ingredient_index
+from recipes.models import CatalogVersion, Ingredient, Tag
+
+INDEX_DIR = tempfile.mkdtemp()
+
+
+@override_settings(INGREDIENT_INDEX_PATH=f'{INDEX_DIR}/ingredient_index.bin')
+class CatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г')
+            for name in ('сахар', 'соль')
+        ])
+        CatalogVersion.objects.bump(Tag)
+        CatalogVersion.objects.bump(Ingredient)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(INDEX_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.build()
+
+    def test_steady_state_does_not_query_database(self):
+        urls = [
+            '/api/tags/',
+            f'/api/tags/{self.tag.pk}/',
+            '/api/ingredients/',
+            '/api/ingredients/?name=сах',
+        ]
+        for url in urls:
+            self.client.get(url)
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_changes_are_visible_after_commit(self):
+        response = self.client.get('/api/tags/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Обед', slug='lunch')
+        updated = self.client.get(
+            '/api/tags/', headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(updated.status_code, 200)
+        self.assertEqual(
+            [tag['slug'] for tag in updated.json()],
+            ['breakfast', 'lunch'],
+        )
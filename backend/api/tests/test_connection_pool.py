@@ -0,0 +1,55 @@
+from unittest import skipUnless
+
+import psycopg2
+from django.db import connection
+from django.test import SimpleTestCase
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from core.postgresql_pool.base import ConnectionPool
+
+
+@skipUnless(connection.vendor == 'postgresql', 'нужен PostgreSQL')
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(
+            max_size=2, timeout=1, max_idle=300, health_checks=True
+        )
+        self.addCleanup(self.pool.close)
+        self.params = connection.get_connection_params()
+
+    def connect(self):
+        return psycopg2.connect(**self.params), None
+
+    def test_connection_closed_in_transaction_is_reset(self):
+        raw, isolation_level = self.pool.get(self.connect)
+        raw.autocommit = False
+        with raw.cursor() as cursor:
+            cursor.execute("SET application_name = 'leaked'")
+            cursor.execute('SELECT 1')
+        self.pool.put(raw, isolation_level)
+
+        reused, _ = self.pool.get(self.connect)
+        self.assertIs(reused, raw)
+        self.assertTrue(reused.autocommit)
+        self.assertEqual(
+            reused.get_transaction_status(), TRANSACTION_STATUS_IDLE
+        )
+        reused.set_session(autocommit=False)
+        with reused.cursor() as cursor:
+            cursor.execute('SHOW application_name')
+            self.assertNotEqual(cursor.fetchone()[0], 'leaked')
+        self.pool.put(reused, None)
+
+    def test_broken_connection_is_replaced(self):
+        raw, isolation_level = self.pool.get(self.connect)
+        backend_pid = raw.get_backend_pid()
+        self.pool.put(raw, isolation_level)
+        killer, _ = self.connect()
+        with killer, killer.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [backend_pid])
+        killer.close()
+
+        fresh, _ = self.pool.get(self.connect)
+        self.assertIsNot(fresh, raw)
+        self.assertNotEqual(fresh.get_backend_pid(), backend_pid)
+        self.pool.put(fresh, None)
@@ -0,0 +1,112 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def user_record(old_id, email, username):
+    return {
+        'type': 'user',
+        'id': old_id,
+        'email': email,
+        'username': username,
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'password': '!',
+        'avatar': '',
+        'is_active': True,
+        'is_staff': False,
+        'is_superuser': False,
+        'date_joined': '2024-01-01T00:00:00+00:00',
+    }
+
+
+def recipe_record(old_id, author_id):
+    return {
+        'type': 'recipe',
+        'id': old_id,
+        'author_id': author_id,
+        'name': f'Рецепт {old_id}',
+        'text': 'Описание',
+        'cooking_time': 10,
+        'image': '',
+        'tags': [],
+        'ingredients': [['соль', 'г', 5]],
+    }
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    INGREDIENT_INDEX_PATH=f'{MEDIA_ROOT}/ingredient_index.bin',
+)
+class ImportConflictsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(
+            email='local@foodgram.local',
+            username='cook',
+            first_name='Повар',
+            last_name='Повар',
+            password='password',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        records = [
+            user_record(1, 'remote@foodgram.local', 'cook'),
+            user_record(2, 'other@foodgram.local', 'baker'),
+            user_record(3, 'other@foodgram.local', 'baker2'),
+            recipe_record(10, 1),
+            recipe_record(11, 2),
+            recipe_record(12, 3),
+        ]
+        self.path = f'{MEDIA_ROOT}/export.ndjson'
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def run_import(self, *args):
+        stderr = StringIO()
+        call_command(
+            'import_foodgram', self.path, *args,
+            stdout=StringIO(), stderr=stderr,
+        )
+        return stderr.getvalue()
+
+    def test_conflicts_are_reported_and_nothing_is_imported(self):
+        with self.assertRaisesMessage(CommandError, 'имя cook уже занято'):
+            self.run_import()
+        self.assertEqual(User.objects.count(), 1)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_skip_drops_conflicting_users_with_their_recipes(self):
+        self.assertIn('пропущен', self.run_import('--on-conflict=skip'))
+        self.assertFalse(
+            User.objects.filter(email='remote@foodgram.local').exists()
+        )
+        self.assertEqual(
+            Recipe.objects.filter(
+                author__email='other@foodgram.local'
+            ).count(),
+            2,
+        )
+
+    def test_rename_keeps_conflicting_users(self):
+        self.run_import('--on-conflict=rename')
+        user = User.objects.get(email='remote@foodgram.local')
+        self.assertEqual(user.username, 'cook-1')
+        self.assertEqual(Recipe.objects.filter(author=user).count(), 1)
@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.ingredient_index import IngredientIndex
+from api.tasks import build_ingredient_index
+from jobs.models import Job
+from recipes.models import Ingredient
+
+INDEX_DIR = tempfile.mkdtemp()
+INDEX_PATH = f'{INDEX_DIR}/ingredient_index.bin'
+
+
+@override_settings(
+    INGREDIENT_INDEX_PATH=INDEX_PATH,
+    INGREDIENT_INDEX_REFRESH_INTERVAL=3600,
+)
+class IngredientIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г')
+            for name in ('сахар', 'сахарная пудра', 'тростниковый сахар')
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(INDEX_DIR, ignore_errors=True)
+
+    def setUp(self):
+        Path(INDEX_PATH).unlink(missing_ok=True)
+        self.index = IngredientIndex()
+
+    def names(self, query):
+        return [record['name'] for record in self.index.search(query)]
+
+    def test_missing_snapshot_is_not_built_on_request(self):
+        self.assertEqual(
+            self.names('сахар'),
+            ['сахар', 'сахарная пудра', 'тростниковый сахар'],
+        )
+        self.assertFalse(Path(INDEX_PATH).exists())
+
+    def test_snapshot_matches_database_search(self):
+        expected = self.names('сахар')
+        self.index.build()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names('сахар'), expected)
+
+    def test_database_search_folds_yo_like_snapshot(self):
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г')
+            for name in ('сок свекольный', 'свёкла')
+        ])
+        queries = ('свек', 'Свёк', 'сок')
+        expected = {query: self.names(query) for query in queries}
+        self.assertEqual(
+            expected['свек'], ['свёкла', 'сок свекольный']
+        )
+        self.index.build()
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(self.names(query), expected[query])
+
+    def test_ingredient_changes_queue_one_rebuild(self):
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        Ingredient.objects.create(name='перец', measurement_unit='г')
+        job = Job.objects.get(name='api.build_ingredient_index')
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertLessEqual(job.run_at, timezone.now())
+
+    def test_rebuild_queues_next_refresh(self):
+        build_ingredient_index()
+        self.assertTrue(Path(INDEX_PATH).exists())
+        job = Job.objects.get(name='api.build_ingredient_index')
+        self.assertGreater(job.run_at, timezone.now())
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import Worker, prune, task
+
+
+@task('tests.noop')
+def noop():
+    pass
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        self.worker = Worker(stale_after=60)
+        self.now = timezone.now()
+
+    def running_job(self, heartbeat):
+        return Job.objects.create(
+            name='tests.noop',
+            status=Job.RUNNING,
+            attempts=1,
+            started_at=self.now - timedelta(hours=1),
+            heartbeat_at=self.now - timedelta(seconds=heartbeat),
+        )
+
+    def test_long_job_with_heartbeat_is_not_reclaimed(self):
+        self.running_job(heartbeat=10)
+        self.assertIsNone(self.worker.claim())
+
+    def test_job_without_heartbeat_is_reclaimed(self):
+        job = self.running_job(heartbeat=600)
+        claimed = self.worker.claim()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_beat_extends_running_jobs(self):
+        job = self.running_job(heartbeat=600)
+        self.worker.running.add((job.pk, job.attempts))
+        self.worker.beat()
+        job.refresh_from_db()
+        self.assertGreaterEqual(job.heartbeat_at, self.now)
+
+    def test_reclaimed_job_keeps_new_runner_state(self):
+        self.running_job(heartbeat=600)
+        job = self.worker.claim()
+        Job.objects.filter(pk=job.pk).update(attempts=job.attempts + 1)
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.worker.execute(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertIsNone(job.finished_at)
+
+    def test_prune_keeps_recent_and_pending_jobs(self):
+        old = self.now - timedelta(days=10)
+        Job.objects.bulk_create([
+            Job(name='tests.noop', status=status, finished_at=finished_at)
+            for status, finished_at in (
+                (Job.DONE, old),
+                (Job.DONE, self.now),
+                (Job.FAILED, old),
+                (Job.FAILED, self.now - timedelta(days=40)),
+                (Job.QUEUED, None),
+            )
+        ])
+        deleted = prune(
+            keep_done=timedelta(days=7).total_seconds(),
+            keep_failed=timedelta(days=30).total_seconds(),
+            batch_size=1,
+        )
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            sorted(Job.objects.values_list('status', flat=True)),
+            [Job.DONE, Job.FAILED, Job.QUEUED],
+        )
@@ -0,0 +1,62 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from api.management.commands.load_ingredients import iter_json_array
+from recipes.models import Ingredient
+
+DATA_DIR = tempfile.mkdtemp()
+
+ITEMS = [
+    {'name': f'ингредиент {number}', 'measurement_unit': 'г'}
+    for number in range(20)
+]
+
+
+@override_settings(INGREDIENT_INDEX_PATH=f'{DATA_DIR}/ingredient_index.bin')
+class LoadIngredientsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+    def load(self, content):
+        path = f'{DATA_DIR}/ingredients.json'
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        call_command('load_ingredients', path, stdout=StringIO())
+
+    def test_array_is_read_in_chunks(self):
+        content = json.dumps(ITEMS, ensure_ascii=False, indent=1)
+        for chunk_size in (1, 7, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    list(iter_json_array(StringIO(content), chunk_size)),
+                    ITEMS,
+                )
+        self.assertEqual(list(iter_json_array(StringIO(' [ ] '))), [])
+
+    def test_json_is_loaded(self):
+        self.load(json.dumps(ITEMS, ensure_ascii=False))
+        self.assertEqual(Ingredient.objects.count(), len(ITEMS))
+
+    def test_invalid_records_are_reported(self):
+        cases = [
+            ([ITEMS[0], {'name': 5, 'measurement_unit': 'г'}], 'Запись 2'),
+            ([ITEMS[0], ['соль', 'г']], 'Запись 2'),
+        ]
+        for items, message in cases:
+            with self.subTest(items=items):
+                with self.assertRaisesMessage(CommandError, message):
+                    self.load(json.dumps(items, ensure_ascii=False))
+        for content in ('{"name": "соль"}', '[{"name": "соль"', '[] []'):
+            with self.subTest(content=content):
+                with self.assertRaisesMessage(
+                    CommandError, 'Ошибка декодирования JSON'
+                ):
+                    self.load(content)
+        self.assertFalse(Ingredient.objects.exists())
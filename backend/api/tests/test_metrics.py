@@ -0,0 +1,67 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from metrics.registry import RETIRED, Registry
+
+User = get_user_model()
+
+METRICS_DIR = tempfile.mkdtemp()
+REQUESTS = 'foodgram_http_requests_total'
+
+
+@override_settings(METRICS_DIR=METRICS_DIR, METRICS_TOKEN='')
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            email='staff@foodgram.local',
+            username='staff',
+            first_name='Админ',
+            last_name='Админ',
+            password='password',
+            is_staff=True,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        Path(METRICS_DIR).mkdir()
+
+    def test_hidden_without_token(self):
+        self.assertEqual(self.client.get('/api/metrics').status_code, 404)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/api/metrics').status_code, 200)
+
+    def test_token_is_required_when_configured(self):
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(
+                self.client.get('/api/metrics').status_code, 403
+            )
+            response = self.client.get(
+                '/api/metrics', headers={'Authorization': 'Bearer secret'}
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_dead_process_snapshots_are_retired(self):
+        labels = [['view', 'test'], ['method', 'GET'], ['status', '200']]
+        for name in ('999999999-1.json', '999999998.json'):
+            (Path(METRICS_DIR) / name).write_text(
+                json.dumps([[REQUESTS, labels, 3]])
+            )
+        key = (REQUESTS, tuple(tuple(pair) for pair in labels))
+        registry = Registry()
+        self.assertEqual(registry.collect()[key], 6)
+        self.assertEqual(
+            sorted(path.name for path in Path(METRICS_DIR).glob('*.json')),
+            [RETIRED],
+        )
+        self.assertEqual(registry.collect()[key], 6)
@@ -0,0 +1,260 @@
+import base64
+import json
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from recipes.models import (
+    FavoriteRecipe,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+from users.models import Subscription
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+AUTHORS = 8
+RECIPES_PER_AUTHOR = 8
+INGREDIENTS_PER_RECIPE = 4
+PAGE_SIZES = (1, 6)
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new('RGB', (32, 32), (200, 100, 50)).save(buffer, 'PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    INGREDIENT_INDEX_PATH=f'{MEDIA_ROOT}/ingredient_index.bin',
+    METRICS_DIR=f'{MEDIA_ROOT}/metrics',
+    NPLUSONE_MODE='strict',
+)
+class QueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = Tag.objects.bulk_create([
+            Tag(name=f'Тэг {number}', slug=f'tag-{number}')
+            for number in range(3)
+        ])
+        cls.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(20)
+        ])
+        cls.authors = [
+            User.objects.create_user(
+                email=f'author{number}@foodgram.local',
+                username=f'author{number}',
+                first_name='Автор',
+                last_name=str(number),
+                password='password',
+            )
+            for number in range(AUTHORS)
+        ]
+        cls.reader = User.objects.create_user(
+            email='reader@foodgram.local',
+            username='reader',
+            first_name='Читатель',
+            last_name='Читатель',
+            password='password',
+        )
+        cls.token = Token.objects.create(user=cls.reader).key
+        cls.author_token = Token.objects.create(user=cls.authors[0]).key
+        cls.recipes = []
+        for author in cls.authors:
+            for number in range(RECIPES_PER_AUTHOR):
+                recipe = Recipe.objects.create(
+                    author=author,
+                    name=f'Рецепт {author.username} {number}',
+                    image='recipes_images/test.png',
+                    text='Описание',
+                    cooking_time=10 + number,
+                )
+                recipe.tags.set(cls.tags[:1 + number % 3])
+                RecipeIngredient.objects.bulk_create([
+                    RecipeIngredient(
+                        recipe=recipe,
+                        ingredient=cls.ingredients[
+                            (number + step * 5) % len(cls.ingredients)
+                        ],
+                        amount=100 + step,
+                    )
+                    for step in range(INGREDIENTS_PER_RECIPE)
+                ])
+                cls.recipes.append(recipe)
+        FavoriteRecipe.objects.bulk_create([
+            FavoriteRecipe(user=cls.reader, recipe=recipe)
+            for recipe in cls.recipes[::2]
+        ])
+        ShoppingCart.objects.bulk_create([
+            ShoppingCart(user=cls.reader, recipe=recipe)
+            for recipe in cls.recipes[::3]
+        ])
+        Subscription.objects.bulk_create([
+            Subscription(user=cls.reader, author=author)
+            for author in cls.authors[:-1]
+        ])
+        Recipe.objects.update_search_vector()
+        Recipe.objects.sync_favorites_count()
+        ShoppingListItem.objects.rebuild()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def measure(self, method, url, data=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format='json')
+            if response.streaming:
+                content = b''.join(response.streaming_content)
+            else:
+                content = response.content
+        self.assertTrue(200 <= response.status_code < 300, content)
+        return response, len(context.captured_queries), content
+
+    def assertBudget(self, method, url, status, queries, size, data=None):
+        response, used, content = self.measure(method, url, data)
+        self.assertEqual(response.status_code, status, content)
+        self.assertLessEqual(used, queries, f'{method.upper()} {url}')
+        self.assertLessEqual(len(content), size, f'{method.upper()} {url}')
+
+    def assertPageBudget(self, url, queries, item_size):
+        separator = '&' if '?' in url else '?'
+        used = {}
+        for page_size in PAGE_SIZES:
+            page_url = f'{url}{separator}limit={page_size}'
+            _, used[page_size], content = self.measure('get', page_url)
+            results = json.loads(content)['results']
+            self.assertEqual(len(results), page_size, page_url)
+            self.assertLessEqual(used[page_size], queries, page_url)
+            self.assertLessEqual(
+                len(content), 200 + item_size * page_size, page_url
+            )
+        self.assertLessEqual(
+            used[max(PAGE_SIZES)], used[min(PAGE_SIZES)],
+            f'{url}: число запросов растёт с размером страницы',
+        )
+
+    def test_recipe_list(self):
+        self.assertPageBudget('/api/recipes/', queries=4, item_size=1000)
+
+    def test_recipe_list_anonymous(self):
+        self.client.credentials()
+        self.assertPageBudget('/api/recipes/', queries=3, item_size=1000)
+
+    def test_recipe_list_filtered(self):
+        self.assertPageBudget(
+            '/api/recipes/?is_favorited=1&tags=tag-0&tags=tag-1',
+            queries=5,
+            item_size=1000,
+        )
+
+    def test_recipe_detail(self):
+        self.assertBudget(
+            'get', f'/api/recipes/{self.recipes[0].pk}/', 200, 4, 1000
+        )
+
+    def test_recipe_create(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {self.author_token}'
+        )
+        data = {
+            'name': 'Новый рецепт',
+            'text': 'Описание',
+            'cooking_time': 15,
+            'image': make_image(),
+            'tags': [tag.pk for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 10}
+                for ingredient in self.ingredients[:6]
+            ],
+        }
+        self.assertBudget('post', '/api/recipes/', 201, 20, 1500, data)
+
+    def test_recipe_update(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {self.author_token}'
+        )
+        data = {
+            'name': 'Обновлённый рецепт',
+            'text': 'Описание',
+            'cooking_time': 20,
+            'image': make_image(),
+            'tags': [tag.pk for tag in self.tags[:2]],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 20}
+                for ingredient in self.ingredients[5:11]
+            ],
+        }
+        self.assertBudget(
+            'patch', f'/api/recipes/{self.recipes[0].pk}/', 200, 21, 1500,
+            data,
+        )
+
+    def test_favorite(self):
+        url = f'/api/recipes/{self.recipes[1].pk}/favorite/'
+        self.assertBudget('post', url, 201, 7, 300)
+        self.assertBudget('delete', url, 204, 7, 0)
+
+    def test_shopping_cart(self):
+        url = f'/api/recipes/{self.recipes[1].pk}/shopping_cart/'
+        self.assertBudget('post', url, 201, 7, 300)
+        self.assertBudget('delete', url, 204, 8, 0)
+
+    def test_download_shopping_cart(self):
+        self.assertBudget(
+            'get', '/api/recipes/download_shopping_cart/', 200, 2, 2000
+        )
+
+    def test_users_list(self):
+        self.assertPageBudget('/api/users/', queries=3, item_size=250)
+
+    def test_users_me(self):
+        self.assertBudget('get', '/api/users/me/', 200, 3, 250)
+
+    def test_subscriptions(self):
+        self.assertPageBudget(
+            '/api/users/subscriptions/?recipes_limit=3',
+            queries=4,
+            item_size=700,
+        )
+
+    def test_subscribe(self):
+        url = f'/api/users/{self.authors[-1].pk}/subscribe/?recipes_limit=3'
+        self.assertBudget('post', url, 201, 6, 700)
+        self.assertBudget('delete', url, 204, 4, 0)
+
+    def test_tags(self):
+        self.assertBudget('get', '/api/tags/', 200, 2, 300)
+        self.assertBudget('get', f'/api/tags/{self.tags[0].pk}/', 200, 2, 100)
+
+    def test_ingredients(self):
+        self.assertBudget('get', '/api/ingredients/', 200, 3, 2000)
+        self.assertBudget(
+            'get', f'/api/ingredients/{self.ingredients[0].pk}/', 200, 3, 100
+        )
+        self.assertBudget(
+            'get', '/api/ingredients/?name=ингр', 200, 3, 2000
+        )
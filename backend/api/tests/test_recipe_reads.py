@@ -0,0 +1,188 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from recipes.models import (
+    CatalogVersion,
+    FavoriteRecipe,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag,
+)
+from users.models import Subscription
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+RECIPES = 6
+LIST_QUERIES = {'anonymous': 3, 'authenticated': 3}
+DETAIL_QUERIES = {'anonymous': 3, 'authenticated': 3}
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    INGREDIENT_INDEX_PATH=f'{MEDIA_ROOT}/ingredient_index.bin',
+    METRICS_DIR=f'{MEDIA_ROOT}/metrics',
+    NPLUSONE_MODE='strict',
+)
+class RecipeReadQueriesTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = Tag.objects.bulk_create([
+            Tag(name=f'Тэг {number}', slug=f'tag-{number}')
+            for number in range(3)
+        ])
+        cls.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(RECIPES)
+        ])
+        cls.authors = [
+            User.objects.create_user(
+                email=f'author{number}@foodgram.local',
+                username=f'author{number}',
+                first_name='Автор',
+                last_name=str(number),
+                password='password',
+            )
+            for number in range(RECIPES)
+        ]
+        cls.reader = User.objects.create_user(
+            email='reader@foodgram.local',
+            username='reader',
+            first_name='Читатель',
+            last_name='Читатель',
+            password='password',
+        )
+        cls.recipes = []
+        for number, author in enumerate(cls.authors):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f'Рецепт {number}',
+                image='recipes_images/test.png',
+                text='Описание',
+                cooking_time=10 + number,
+            )
+            recipe.tags.set(cls.tags[:1 + number % 3])
+            RecipeIngredient.objects.bulk_create([
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                )
+                for ingredient in cls.ingredients[:number + 1]
+            ])
+            cls.recipes.append(recipe)
+        FavoriteRecipe.objects.bulk_create([
+            FavoriteRecipe(user=cls.reader, recipe=recipe)
+            for recipe in cls.recipes[::2]
+        ])
+        ShoppingCart.objects.bulk_create([
+            ShoppingCart(user=cls.reader, recipe=recipe)
+            for recipe in cls.recipes[1::2]
+        ])
+        Subscription.objects.bulk_create([
+            Subscription(user=cls.reader, author=author)
+            for author in cls.authors[::3]
+        ])
+        CatalogVersion.objects.bump(Tag)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, viewer):
+        if viewer == 'authenticated':
+            self.client.force_authenticate(self.reader)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        for viewer, queries in LIST_QUERIES.items():
+            self.login(viewer)
+            for limit in (1, RECIPES):
+                with self.subTest(viewer=viewer, limit=limit):
+                    cache.clear()
+                    with self.assertNumQueries(queries):
+                        response = self.client.get(
+                            '/api/recipes/', {'limit': limit}
+                        )
+                    self.assertEqual(len(response.json()['results']), limit)
+
+    def test_retrieve_queries_do_not_grow_with_rows(self):
+        for viewer, queries in DETAIL_QUERIES.items():
+            self.login(viewer)
+            for recipe in (self.recipes[0], self.recipes[-1]):
+                with self.subTest(viewer=viewer, recipe=recipe.pk):
+                    cache.clear()
+                    with self.assertNumQueries(queries):
+                        response = self.client.get(
+                            f'/api/recipes/{recipe.pk}/'
+                        )
+                    self.assertEqual(response.status_code, 200)
+
+    def test_flags_match_viewer(self):
+        self.login('authenticated')
+        results = self.client.get(
+            '/api/recipes/', {'limit': RECIPES}
+        ).json()['results']
+        flags = {
+            recipe['id']: (
+                recipe['is_favorited'],
+                recipe['is_in_shopping_cart'],
+                recipe['author']['is_subscribed'],
+            )
+            for recipe in results
+        }
+        for number, recipe in enumerate(self.recipes):
+            self.assertEqual(
+                flags[recipe.pk],
+                (number % 2 == 0, number % 2 == 1, number % 3 == 0),
+            )
+
+    def test_tag_rename_refreshes_cached_recipes(self):
+        recipe = self.recipes[0]
+        url = f'/api/recipes/{recipe.pk}/'
+        etag = self.client.get(url)['ETag']
+        updated_at = Recipe.objects.get(pk=recipe.pk).updated_at
+        tag = self.tags[0]
+        tag.name = 'Новый тэг'
+        tag.save()
+        response = self.client.get(url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['tags'][0]['name'], tag.name)
+        self.assertEqual(
+            Recipe.objects.get(pk=recipe.pk).updated_at, updated_at
+        )
+
+    def test_list_without_tag_catalog_version(self):
+        CatalogVersion.objects.all().delete()
+        for limit in (1, RECIPES):
+            with self.subTest(limit=limit):
+                cache.clear()
+                with self.assertNumQueries(LIST_QUERIES['anonymous'] + 1):
+                    response = self.client.get(
+                        '/api/recipes/', {'limit': limit}
+                    )
+                self.assertEqual(len(response.json()['results']), limit)
+
+    def test_stale_user_save_keeps_recipes_count(self):
+        author = User.objects.get(pk=self.authors[0].pk)
+        Recipe.objects.create(
+            author=author,
+            name='Новый рецепт',
+            image='recipes_images/test.png',
+            text='Описание',
+            cooking_time=10,
+        )
+        author.first_name = 'Новое имя'
+        author.save()
+        self.assertEqual(
+            User.objects.get(pk=author.pk).recipes_count,
+            author.recipes_count + 1,
+        )
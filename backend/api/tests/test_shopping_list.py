@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+)
+
+User = get_user_model()
+
+
+class ShoppingListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email='admin@foodgram.local',
+            username='admin',
+            first_name='Админ',
+            last_name='Админ',
+            password='password',
+        )
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{number}@foodgram.local',
+                username=f'user{number}',
+                first_name='Пользователь',
+                last_name=str(number),
+                password='password',
+            )
+            for number in range(2)
+        ]
+        cls.ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(3)
+        ])
+        cls.recipes = []
+        for number in range(2):
+            recipe = Recipe.objects.create(
+                author=cls.admin,
+                name=f'Рецепт {number}',
+                image='recipes_images/test.png',
+                text='Описание',
+                cooking_time=10,
+            )
+            RecipeIngredient.objects.bulk_create([
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                )
+                for ingredient in cls.ingredients[number:number + 2]
+            ])
+            cls.recipes.append(recipe)
+        ShoppingCart.objects.bulk_create([
+            ShoppingCart(user=user, recipe=recipe)
+            for user in cls.users
+            for recipe in cls.recipes
+        ])
+        ShoppingListItem.objects.rebuild()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def amounts(self, user):
+        return dict(
+            ShoppingListItem.objects.filter(user=user).values_list(
+                'ingredient__name', 'amount'
+            )
+        )
+
+    def test_remove_recipe_only_touches_its_rows(self):
+        ShoppingListItem.objects.remove_recipe(
+            self.recipes[0], self.users[0]
+        )
+        self.assertEqual(
+            self.amounts(self.users[0]),
+            {'Ингредиент 1': 100, 'Ингредиент 2': 100},
+        )
+        self.assertEqual(len(self.amounts(self.users[1])), 3)
+
+    def test_admin_changes_keep_totals(self):
+        recipe_ingredient = RecipeIngredient.objects.get(
+            recipe=self.recipes[0], ingredient=self.ingredients[1]
+        )
+        changes = [
+            (
+                f'/admin/recipes/recipeingredient/{recipe_ingredient.pk}/'
+                f'change/',
+                {
+                    'recipe': self.recipes[1].pk,
+                    'ingredient': self.ingredients[0].pk,
+                    'amount': 50,
+                },
+            ),
+            (
+                '/admin/recipes/shoppingcart/'
+                f'{ShoppingCart.objects.first().pk}/delete/',
+                {'post': 'yes'},
+            ),
+            (
+                f'/admin/recipes/recipe/{self.recipes[0].pk}/delete/',
+                {'post': 'yes'},
+            ),
+        ]
+        for url, data in changes:
+            with self.subTest(url=url):
+                response = self.client.post(url, data)
+                self.assertEqual(response.status_code, 302)
+                self.assertEqual(
+                    ShoppingListItem.objects.count_mismatches(), 0
+                )
+
+    def test_author_deletion_cascades_to_shopping_lists(self):
+        User.objects.filter(pk=self.admin.pk).delete()
+        self.assertFalse(ShoppingListItem.objects.exists())
+        self.assertEqual(ShoppingListItem.objects.count_mismatches(), 0)
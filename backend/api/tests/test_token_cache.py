@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from api.authentication import TokenCache, token_cache
+
+User = get_user_model()
+
+CACHE_DIR = tempfile.mkdtemp()
+
+
+class TokenCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user{number}@foodgram.local',
+                username=f'user{number}',
+                first_name='Пользователь',
+                last_name=str(number),
+                password='password',
+            )
+            for number in range(2)
+        ]
+        cls.tokens = [
+            Token.objects.create(user=user) for user in cls.users
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.web = TokenCache()
+        self.worker = TokenCache()
+        for token in self.tokens:
+            self.web.set(token.key, token.user, token)
+
+    def cached(self):
+        return [
+            self.web.get(token.key) is not None for token in self.tokens
+        ]
+
+    def change(self, user, **fields):
+        user = User.objects.get(pk=user.pk)
+        for name, value in fields.items():
+            setattr(user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+    def test_profile_and_login_updates_keep_entries(self):
+        self.change(self.users[0], first_name='Новое имя')
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(pk=self.users[0].pk).save(
+                update_fields=['last_login']
+            )
+        self.assertEqual(self.cached(), [True, True])
+
+    def test_password_change_evicts_only_that_user(self):
+        self.change(self.users[0], password='changed')
+        self.assertEqual(self.cached(), [False, True])
+
+    def test_invalidation_reaches_other_processes(self):
+        self.worker.invalidate(self.users[1].pk)
+        self.assertEqual(self.cached(), [True, False])
+
+    def test_deleted_token_is_evicted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tokens[0].delete()
+        self.assertEqual(self.cached(), [False, True])
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@foodgram.local',
+            username='user',
+            first_name='Пользователь',
+            last_name='Пользователь',
+            password='password',
+        )
+        cls.token = Token.objects.create(user=cls.user).key
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        token_cache.entries.clear()
+
+    def get_me(self):
+        return self.client.get(
+            '/api/users/me/',
+            headers={'Authorization': f'Token {self.token}'},
+        )
+
+    def test_local_cache_is_not_used(self):
+        self.assertEqual(self.get_me().status_code, 200)
+        self.assertFalse(token_cache.entries)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.get_me().status_code, 401)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    }})
+    def test_shared_cache_is_used(self):
+        self.assertEqual(self.get_me().status_code, 200)
+        self.assertIn(self.token, token_cache.entries)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.get_me().status_code, 401)
@@ -1,6 +1,8 @@
-import csv
-from django.http import HttpResponse
-from django.db.models import Count, Sum, F
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Prefetch, Window
+from django.db.models.functions import Greatest, RowNumber
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import (
@@ -20,12 +22,22 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
+from .async_views import AsyncReadMixin, aiterate, is_asgi
+from .catalog import CatalogViewMixin, ingredient_catalog, tag_catalog
+from .conditional import async_conditional_get, conditional_get, make_etag
+from .ingredient_index import ingredient_index
+from .renderers import (
+    SHOPPING_LIST_RENDERERS,
+    ShoppingListContentNegotiation,
+)
 from .serializers import (
     TagSerializer,
     IngredientSerializer,
     RecipeSerializer,
     RecipeFavouriteSerializer,
     RecipeCreateSerializer,
+    RecipesLimitSerializer,
+    ShoppingListItemSerializer,
     SubscribeSerializer,
     UserSerializer,
     UserRegisterSerializer,
@@ -38,10 +50,14 @@ from recipes.models import (
     Ingredient,
     Recipe,
     ShoppingCart,
+    ShoppingListItem,
     FavoriteRecipe,
 )
 from users.models import Subscription
+from core.constants import SHOPPING_LIST_CHUNK_SIZE
+from core.filters import RecipeSearchFilter
 from core.paginations import (
+    RecipesCursorPagination,
     RecipesListPagination,
     UsersListPagination,
 )
@@ -54,9 +70,28 @@ from core.permissions import (
 User = get_user_model()
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(
+    AsyncReadMixin, CatalogViewMixin, viewsets.ReadOnlyModelViewSet
+):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    catalog = tag_catalog
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return self.list_catalog(request, *args, **kwargs)
+
+    @async_conditional_get
+    async def alist(self, request, *args, **kwargs):
+        return await self.alist_catalog(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return self.retrieve_catalog(request, *args, **kwargs)
+
+    @async_conditional_get
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aretrieve_catalog(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
         if 'pk' in kwargs:
@@ -76,7 +111,9 @@ class IngredientFilter(FilterSet):
         fields = ['name']
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    AsyncReadMixin, CatalogViewMixin, viewsets.ReadOnlyModelViewSet
+):
     queryset = Ingredient.objects.all()
     permission_classes = [
         IsAuthenticatedOrReadOnly,
@@ -84,6 +121,31 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = IngredientSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = IngredientFilter
+    catalog = ingredient_catalog
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return Response(ingredient_index.search(name))
+        return self.list_catalog(request, *args, **kwargs)
+
+    @async_conditional_get
+    async def alist(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return Response(
+                await sync_to_async(ingredient_index.search)(name)
+            )
+        return await self.alist_catalog(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return self.retrieve_catalog(request, *args, **kwargs)
+
+    @async_conditional_get
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aretrieve_catalog(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
         if 'pk' in kwargs:
@@ -129,16 +191,30 @@ class RecipeFilter(FilterSet):
         return queryset
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = [
         IsAuthenticatedOrReadOnly,
         IsAuthorOrReadOnly,
     ]
-    pagination_class = RecipesListPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        RecipeSearchFilter,
+        filters.OrderingFilter,
+    ]
     filterset_class = RecipeFilter
     search_fields = ['name']
+    ordering_fields = ['id', 'favorites_count']
+    vary_on_user = True
+
+    @property
+    def pagination_class(self):
+        if self.request.query_params.get('pagination') == 'cursor':
+            return RecipesCursorPagination
+        return RecipesListPagination
+
+    def supports_async(self, request):
+        return request.GET.get('pagination') != 'cursor'
 
     def get_serializer_class(self):
         if self.action == 'list' or self.action == 'retrieve':
@@ -147,6 +223,59 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return RecipeCreateSerializer
         return super().get_serializer_class()
 
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return Recipe.objects.for_reading(self.request.user)
+        return Recipe.objects.all()
+
+    def get_cache_state(self, request):
+        try:
+            recipes = Recipe.objects.filter(pk=self.kwargs[self.lookup_field])
+        except (TypeError, ValueError):
+            return None
+        return recipes.with_user_flags(
+            request.user
+        ).with_author_subscription(
+            request.user
+        ).with_tags_version().values_list(
+            'updated_at',
+            'tags_version',
+            'favorites_count',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'author_is_subscribed',
+            'author__email',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'author__avatar',
+        )
+
+    def make_cache_validators(self, state):
+        if state is None:
+            return None, None
+        return make_etag(self.kwargs[self.lookup_field], *state), None
+
+    def get_cache_validators(self, request):
+        states = self.get_cache_state(request)
+        return self.make_cache_validators(
+            None if states is None else states.first()
+        )
+
+    async def aget_cache_validators(self, request):
+        states = self.get_cache_state(request)
+        return self.make_cache_validators(
+            None if states is None else await states.afirst()
+        )
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @async_conditional_get
+    async def aretrieve(self, request, *args, **kwargs):
+        return await super().aretrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -176,7 +305,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if request.method == 'POST':
             if author.favorited_by.filter(recipe=recipe).exists():
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            FavoriteRecipe.objects.create(user=author, recipe=recipe)
+            with transaction.atomic():
+                FavoriteRecipe.objects.create(user=author, recipe=recipe)
+                Recipe.objects.filter(pk=recipe.pk).update(
+                    favorites_count=F('favorites_count') + 1
+                )
             serializer = RecipeFavouriteSerializer(recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -186,7 +319,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
             ).first()
             if not favorite_item:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            favorite_item.delete()
+            with transaction.atomic():
+                favorite_item.delete()
+                Recipe.objects.filter(pk=recipe.pk).update(
+                    favorites_count=Greatest(F('favorites_count') - 1, 0)
+                )
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -201,7 +338,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if request.method == 'POST':
             if author.shopping_cart.filter(recipe=recipe).exists():
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            ShoppingCart.objects.create(user=author, recipe=recipe)
+            with transaction.atomic():
+                ShoppingCart.objects.create(user=author, recipe=recipe)
+                ShoppingListItem.objects.add_recipe(recipe, author)
             serializer = RecipeFavouriteSerializer(recipe)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -211,7 +350,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
             ).first()
             if not shopping_cart_item:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            shopping_cart_item.delete()
+            with transaction.atomic():
+                ShoppingListItem.objects.remove_recipe(recipe, author)
+                shopping_cart_item.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -219,37 +360,45 @@ class RecipeViewSet(viewsets.ModelViewSet):
         methods=['get'],
         permission_classes=[IsAuthenticated],
     )
+    def shopping_list(self, request):
+        items = request.user.shopping_list.select_related(
+            'ingredient'
+        ).order_by('ingredient__name')
+        serializer = ShoppingListItemSerializer(items, many=True)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        renderer_classes=SHOPPING_LIST_RENDERERS,
+        content_negotiation_class=ShoppingListContentNegotiation,
+    )
     def download_shopping_cart(self, request):
         user = request.user
+        renderer = request.accepted_renderer
 
         ingredients_data = (
-            ShoppingCart.objects.filter(user=user)
+            ShoppingListItem.objects.filter(user=user)
             .values(
-                ingredient_name=F(
-                    'recipe__recipeingredient__ingredient__name'
-                ),
-                measurement_unit=F(
-                    'recipe__recipeingredient__ingredient__measurement_unit'
-                ),
+                ingredient_name=F('ingredient__name'),
+                measurement_unit=F('ingredient__measurement_unit'),
+                total_amount=F('amount'),
             )
-            .annotate(total_amount=Sum('recipe__recipeingredient__amount'))
             .order_by('ingredient_name')
+            .iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
         )
 
-        response = HttpResponse(content_type='text/csv')
+        content = renderer.stream(ingredients_data)
+        if is_asgi(request):
+            content = aiterate(content, SHOPPING_LIST_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            content,
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
         response['Content-Disposition'] = (
-            'attachment; filename="shopping_cart.csv"'
+            f'attachment; filename="shopping_cart.{renderer.format}"'
         )
-        writer = csv.writer(response)
-        writer.writerow(['Ингредиент', 'Количество', 'Единица измерения'])
-
-        for ingredient in ingredients_data:
-            writer.writerow([
-                ingredient['ingredient_name'],
-                ingredient['total_amount'],
-                ingredient['measurement_unit'],
-            ])
-
         return response
 
 
@@ -272,6 +421,22 @@ class UsersViewSet(viewsets.ModelViewSet):
             self.permission_classes = [IsAuthenticatedOrReadOnly]
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if (
+            self.action in ('list', 'retrieve')
+            and self.request.user.is_authenticated
+        ):
+            return queryset.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=self.request.user,
+                        author=OuterRef('pk'),
+                    )
+                )
+            )
+        return queryset
+
     def get_serializer_class(self):
         return {
             'create': UserRegisterSerializer,
@@ -290,7 +455,9 @@ class UsersViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def me(self, request):
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(
+            User.objects.get(pk=request.user.pk)
+        )
         return Response(serializer.data)
 
     @action(
@@ -310,9 +477,12 @@ class UsersViewSet(viewsets.ModelViewSet):
             return Response({'avatar': avatar_url}, status=status.HTTP_200_OK)
 
         if request.method == 'DELETE':
-            user = request.user
-            if user.avatar:
-                user.avatar.delete(save=True)
+            with transaction.atomic():
+                user = User.objects.select_for_update().get(
+                    pk=request.user.pk
+                )
+                user.avatar = None
+                user.save(update_fields=['avatar'])
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -329,6 +499,32 @@ class UsersViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def get_recipes_limit(self):
+        serializer = RecipesLimitSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data.get('recipes_limit')
+
+    def get_subscribed_authors(self, queryset, recipes_limit):
+        recipes = Recipe.objects.all()
+        if recipes_limit is not None:
+            recipes = recipes.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F('author'),
+                    order_by=F('id').desc(),
+                )
+            ).filter(row_number__lte=recipes_limit)
+        return queryset.annotate(
+            is_subscribed=Exists(
+                Subscription.objects.filter(
+                    user=self.request.user,
+                    author=OuterRef('pk'),
+                )
+            )
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='limited_recipes')
+        )
+
     @action(
         detail=True,
         methods=['post', 'delete'],
@@ -346,19 +542,25 @@ class UsersViewSet(viewsets.ModelViewSet):
                     {'error': 'Уже подписан'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            author = User.objects.annotate(
-                recipes_count=Count('recipes')
-            ).get(pk=author.pk)
             serializer = SubscribeSerializer(
                 author,
                 context={'request': request}
             )
             serializer.validate({})
+            recipes_limit = self.get_recipes_limit()
 
-            subscription = Subscription.objects.create(
+            Subscription.objects.create(
                 user=request.user,
                 author=author
             )
+            author = self.get_subscribed_authors(
+                User.objects.filter(pk=author.pk),
+                recipes_limit,
+            ).get()
+            serializer = SubscribeSerializer(
+                author,
+                context={'request': request}
+            )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         elif request.method == 'DELETE':
@@ -377,9 +579,10 @@ class UsersViewSet(viewsets.ModelViewSet):
         url_path='subscriptions'
     )
     def subscriptions(self, request):
-        subscriptions = User.objects.filter(
-            subscription_author__user=request.user
-        ).annotate(recipes_count=Count('recipes'))
+        subscriptions = self.get_subscribed_authors(
+            User.objects.filter(subscription_author__user=request.user),
+            self.get_recipes_limit(),
+        )
         page = self.paginate_queryset(subscriptions)
         if page is not None:
             serializer = SubscribeSerializer(
@@ -0,0 +1,49 @@
+import argparse
+import json
+from pathlib import Path
+
+METRICS = [
+    ('rps', lambda summary: summary['throughput']),
+    ('p50', lambda summary: summary['latency_ms']['p50']),
+    ('p95', lambda summary: summary['latency_ms']['p95']),
+    ('p99', lambda summary: summary['latency_ms']['p99']),
+    ('SQL', lambda summary: summary['queries']['mean']),
+]
+
+
+def format_change(before, after):
+    if before is None or after is None:
+        return f'{"—":>24}'
+    change = f'{(after - before) / before * 100:+.0f}%' if before else ''
+    return f'{before:>9.1f} → {after:<7.1f}{change:>6}'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнение двух отчётов load.py'
+    )
+    parser.add_argument('before', type=Path)
+    parser.add_argument('after', type=Path)
+    args = parser.parse_args()
+
+    before = json.loads(args.before.read_text())
+    after = json.loads(args.after.read_text())
+    print(f'{before["commit"]} → {after["commit"]}')
+    if before['dataset'] != after['dataset'] or before['mix'] != after['mix']:
+        print('Внимание: отчёты получены на разных данных или смесях')
+    scenarios = [
+        *[name for name in after['scenarios'] if name in before['scenarios']],
+        'total',
+    ]
+    for name in scenarios:
+        if name == 'total':
+            summaries = before['total'], after['total']
+        else:
+            summaries = before['scenarios'][name], after['scenarios'][name]
+        print(name)
+        for metric, getter in METRICS:
+            print(f'  {metric:<5}{format_change(*map(getter, summaries))}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from load import MIXES, RESULTS_DIR, get_commit, run, start_server
+
+CONFIGS = {
+    'no-persist': {'DB_POOL_MAX_SIZE': '0', 'DB_CONN_MAX_AGE': '0'},
+    'persistent': {'DB_POOL_MAX_SIZE': '0', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {},
+}
+# Под ASGI каждый запрос получает своё соединение, и постоянные
+# соединения без пула не переиспользуются, а копятся до таймаута.
+ASGI_CONFIGS = ('no-persist', 'pool')
+
+
+def print_report(results):
+    print(
+        f'{"режим":<22}{"запросов":>10}{"ошибок":>8}{"rps":>9}'
+        f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+    )
+    for name, (total, scenarios) in results.items():
+        for label, summary in [('', total), *scenarios.items()]:
+            latency = summary['latency_ms']
+            row = f'{name}' if not label else f'  {label}'
+            print(
+                f'{row:<22}{summary["requests"]:>10}{summary["errors"]:>8}'
+                f'{summary["throughput"]:>9.1f}{latency["p50"] or 0:>10.1f}'
+                f'{latency["p95"] or 0:>10.1f}{latency["p99"] or 0:>10.1f}'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            'Сравнение соединений с БД: новое на каждый запрос, '
+            'постоянные соединения и пул'
+        )
+    )
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument(
+        '--modes',
+        nargs='+',
+        choices=('wsgi', 'asgi'),
+        default=['wsgi', 'asgi'],
+    )
+    parser.add_argument(
+        '--configs',
+        nargs='+',
+        choices=CONFIGS,
+        default=list(CONFIGS),
+    )
+    parser.add_argument('--pool-size', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mix', choices=MIXES, default='catalog')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--auth-ratio', type=float, default=0.7)
+    parser.add_argument(
+        '--dataset',
+        type=Path,
+        default=RESULTS_DIR / 'dataset.json',
+        help='Манифест, записанный seed.py',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Файл отчёта, по умолчанию results/conn-<время>-<коммит>.json',
+    )
+    args = parser.parse_args()
+
+    dataset = json.loads(args.dataset.read_text())
+    base_url = args.base_url.rstrip('/')
+    started_at = datetime.now(timezone.utc)
+    results = {}
+    for mode in args.modes:
+        for config in args.configs:
+            if mode == 'asgi' and config not in ASGI_CONFIGS:
+                continue
+            env = {
+                'DB_POOL_MAX_SIZE': str(args.pool_size),
+                **CONFIGS[config],
+            }
+            server = start_server(base_url, args.workers, mode, env)
+            try:
+                results[f'{mode}/{config}'] = run(args, dataset)
+            finally:
+                server.terminate()
+                server.wait()
+
+    print_report(results)
+    commit = get_commit()
+    report = {
+        'commit': commit,
+        'started_at': started_at.isoformat(),
+        'base_url': args.base_url,
+        'mix': args.mix,
+        'weights': MIXES[args.mix],
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'auth_ratio': args.auth_ratio,
+        'workers': args.workers,
+        'pool_size': args.pool_size,
+        'dataset': dataset['scale'],
+        'results': {
+            name: {'total': total, 'scenarios': scenarios}
+            for name, (total, scenarios) in results.items()
+        },
+    }
+    output = args.output or RESULTS_DIR / (
+        f'conn-{started_at:%Y%m%d-%H%M%S}-{commit or "unknown"}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f'Отчёт сохранён в {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def recipes_page(dataset, rng):
+    return '/api/recipes/?' + urlencode({
+        'page': 1 + int(20 * rng.random() ** 2),
+        'limit': 6,
+    })
+
+
+def recipes_by_tags(dataset, rng):
+    tags = rng.sample(dataset['tags'], min(2, len(dataset['tags'])))
+    return '/api/recipes/?' + urlencode(
+        [('tags', tag) for tag in tags] + [('page', rng.randint(1, 5))]
+    )
+
+
+def recipes_by_author(dataset, rng):
+    return '/api/recipes/?' + urlencode(
+        {'author': rng.choice(dataset['user_ids'])}
+    )
+
+
+def recipes_search(dataset, rng):
+    return '/api/recipes/?' + urlencode(
+        {'search': rng.choice(dataset['search_terms'])}
+    )
+
+
+def recipe_detail(dataset, rng):
+    return f'/api/recipes/{rng.choice(dataset["recipe_ids"])}/'
+
+
+def recipes_favorited(dataset, rng):
+    return '/api/recipes/?is_favorited=1'
+
+
+def recipes_in_cart(dataset, rng):
+    return '/api/recipes/?is_in_shopping_cart=1'
+
+
+def users_page(dataset, rng):
+    return f'/api/users/?page={rng.randint(1, 20)}'
+
+
+def user_detail(dataset, rng):
+    return f'/api/users/{rng.choice(dataset["user_ids"])}/'
+
+
+def users_me(dataset, rng):
+    return '/api/users/me/'
+
+
+def subscriptions(dataset, rng):
+    return '/api/users/subscriptions/?recipes_limit=3'
+
+
+def ingredients_search(dataset, rng):
+    term = rng.choice(dataset['search_terms'])
+    return '/api/ingredients/?' + urlencode(
+        {'name': term[:rng.randint(1, len(term))]}
+    )
+
+
+def tags(dataset, rng):
+    return '/api/tags/'
+
+
+def cart_export(dataset, rng):
+    return '/api/recipes/download_shopping_cart/'
+
+
+SCENARIOS = {
+    'recipes_page': (recipes_page, False),
+    'recipes_by_tags': (recipes_by_tags, False),
+    'recipes_by_author': (recipes_by_author, False),
+    'recipes_search': (recipes_search, False),
+    'recipe_detail': (recipe_detail, False),
+    'recipes_favorited': (recipes_favorited, True),
+    'recipes_in_cart': (recipes_in_cart, True),
+    'users_page': (users_page, False),
+    'user_detail': (user_detail, False),
+    'users_me': (users_me, True),
+    'subscriptions': (subscriptions, True),
+    'ingredients_search': (ingredients_search, False),
+    'tags': (tags, False),
+    'cart_export': (cart_export, True),
+}
+
+MIXES = {
+    'browse': {
+        'recipes_page': 35,
+        'recipes_by_tags': 15,
+        'recipe_detail': 30,
+        'recipes_search': 5,
+        'recipes_by_author': 5,
+        'user_detail': 5,
+        'tags': 5,
+    },
+    'mixed': {
+        'recipes_page': 20,
+        'recipes_by_tags': 10,
+        'recipes_by_author': 5,
+        'recipes_search': 5,
+        'recipe_detail': 20,
+        'recipes_favorited': 5,
+        'recipes_in_cart': 3,
+        'users_page': 3,
+        'user_detail': 5,
+        'users_me': 5,
+        'subscriptions': 5,
+        'ingredients_search': 8,
+        'tags': 4,
+        'cart_export': 2,
+    },
+    'catalog': {
+        'tags': 40,
+        'ingredients_search': 30,
+        'recipe_detail': 30,
+    },
+    'cart': {
+        'recipes_in_cart': 30,
+        'recipe_detail': 20,
+        'ingredients_search': 20,
+        'cart_export': 30,
+    },
+}
+EXPORT_FORMATS = ['text/csv', 'text/plain']
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, base_url, dataset, mix, token, deadline, timeout, seed):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.dataset = dataset
+        self.token = token
+        self.deadline = deadline
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.mix = {
+            name: weight for name, weight in mix.items()
+            if token or not SCENARIOS[name][1]
+        }
+        self.samples = []
+
+    def request(self, path):
+        headers = {'Accept': 'application/json'}
+        if path.endswith('download_shopping_cart/'):
+            headers['Accept'] = self.rng.choice(EXPORT_FORMATS)
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+        request = Request(self.base_url + path, headers=headers)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status, response.headers
+        except HTTPError as error:
+            error.read()
+            return error.code, error.headers
+        except (URLError, OSError):
+            return 0, {}
+
+    def run(self):
+        names = list(self.mix)
+        weights = list(self.mix.values())
+        while time.monotonic() < self.deadline:
+            name = self.rng.choices(names, weights)[0]
+            path = SCENARIOS[name][0](self.dataset, self.rng)
+            started = time.monotonic()
+            status, headers = self.request(path)
+            latency = time.monotonic() - started
+            queries = headers.get('X-Query-Count')
+            self.samples.append((
+                name,
+                started,
+                latency * 1000,
+                status,
+                int(queries) if queries is not None else None,
+            ))
+
+
+def percentiles(values):
+    if len(values) < 2:
+        value = values[0] if values else None
+        return value, value, value
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+def summarize(samples, elapsed):
+    latencies = [sample[2] for sample in samples]
+    queries = [sample[4] for sample in samples if sample[4] is not None]
+    p50, p95, p99 = percentiles(latencies)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not 200 <= sample[3] < 400),
+        'throughput': len(samples) / elapsed if elapsed else 0,
+        'latency_ms': {
+            'mean': statistics.fmean(latencies) if latencies else None,
+            'p50': p50,
+            'p95': p95,
+            'p99': p99,
+            'max': max(latencies, default=None),
+        },
+        'queries': {
+            'mean': statistics.fmean(queries) if queries else None,
+            'max': max(queries, default=None),
+        },
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(base_url, workers, mode='wsgi', env=None):
+    address = urlsplit(base_url)
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '--bind', f'{address.hostname}:{address.port or 80}',
+            '--workers', str(workers),
+        ],
+        cwd=BACKEND_DIR,
+        env={
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+            'SERVER_MODE': mode,
+            **(env or {}),
+        },
+    )
+    for _ in range(300):
+        if server.poll() is not None:
+            raise SystemExit('gunicorn завершился при запуске')
+        try:
+            with urlopen(base_url + '/api/tags/', timeout=1):
+                return server
+        except (URLError, OSError):
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit('gunicorn не ответил за 30 с')
+
+
+def run(args, dataset):
+    mix = MIXES[args.mix]
+    started = time.monotonic()
+    deadline = started + args.warmup + args.duration
+    tokens = dataset['tokens']
+    users = [
+        VirtualUser(
+            args.base_url.rstrip('/'),
+            dataset,
+            mix,
+            tokens[number % len(tokens)]
+            if tokens and number < args.concurrency * args.auth_ratio
+            else None,
+            deadline,
+            args.timeout,
+            args.seed + number,
+        )
+        for number in range(args.concurrency)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    measured_from = started + args.warmup
+    samples = [
+        sample for user in users for sample in user.samples
+        if sample[1] >= measured_from
+    ]
+    elapsed = time.monotonic() - measured_from
+    scenarios = {}
+    for name in mix:
+        scenario_samples = [sample for sample in samples if sample[0] == name]
+        if scenario_samples:
+            scenarios[name] = summarize(scenario_samples, elapsed)
+    return summarize(samples, elapsed), scenarios
+
+
+def print_report(total, scenarios):
+    print(
+        f'{"сценарий":<20}{"запросов":>10}{"ошибок":>8}{"rps":>9}'
+        f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"SQL":>7}'
+    )
+    for name, summary in [*scenarios.items(), ('всего', total)]:
+        latency = summary['latency_ms']
+        queries = summary['queries']['mean']
+        print(
+            f'{name:<20}{summary["requests"]:>10}{summary["errors"]:>8}'
+            f'{summary["throughput"]:>9.1f}{latency["p50"] or 0:>10.1f}'
+            f'{latency["p95"] or 0:>10.1f}{latency["p99"] or 0:>10.1f}'
+            + (f'{queries:>7.1f}' if queries is not None else f'{"—":>7}')
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный прогон API на данных из seed.py'
+    )
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--mix', choices=MIXES, default='mixed')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--auth-ratio',
+        type=float,
+        default=0.7,
+        help='Доля виртуальных пользователей с токеном',
+    )
+    parser.add_argument(
+        '--dataset',
+        type=Path,
+        default=RESULTS_DIR / 'dataset.json',
+        help='Манифест, записанный seed.py',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Файл отчёта, по умолчанию results/load-<время>-<коммит>.json',
+    )
+    parser.add_argument(
+        '--start-server',
+        action='store_true',
+        help='Запустить gunicorn с настройками benchmarks.settings',
+    )
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument(
+        '--server-mode',
+        choices=('wsgi', 'asgi'),
+        default='wsgi',
+        help='Режим gunicorn для --start-server',
+    )
+    args = parser.parse_args()
+
+    dataset = json.loads(args.dataset.read_text())
+    server = None
+    if args.start_server:
+        server = start_server(
+            args.base_url.rstrip('/'), args.workers, args.server_mode
+        )
+    try:
+        started_at = datetime.now(timezone.utc)
+        total, scenarios = run(args, dataset)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(total, scenarios)
+    if total['queries']['mean'] is None:
+        print(
+            'Сервер не вернул X-Query-Count: запустите его с '
+            'DJANGO_SETTINGS_MODULE=benchmarks.settings'
+        )
+    commit = get_commit()
+    report = {
+        'commit': commit,
+        'started_at': started_at.isoformat(),
+        'base_url': args.base_url,
+        'mix': args.mix,
+        'weights': MIXES[args.mix],
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'auth_ratio': args.auth_ratio,
+        'workers': args.workers if args.start_server else None,
+        'server_mode': args.server_mode if args.start_server else None,
+        'dataset': dataset['scale'],
+        'total': total,
+        'scenarios': scenarios,
+    }
+    output = args.output or RESULTS_DIR / (
+        f'load-{started_at:%Y%m%d-%H%M%S}-{commit or "unknown"}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f'Отчёт сохранён в {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+from metrics.middleware import ExecuteWrapperMiddleware, QueryCounter
+
+
+class QueryCountMiddleware(ExecuteWrapperMiddleware):
+    def get_wrapper(self, request):
+        return QueryCounter()
+
+    def process_response(self, request, response, counter):
+        response['X-Query-Count'] = counter.count
+        response['X-Query-Duration'] = f'{counter.duration * 1000:.3f}'
+        return response
@@ -0,0 +1,158 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from rest_framework.filters import SearchFilter  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from core.filters import RecipeSearchFilter  # noqa: E402
+from recipes.models import Recipe  # noqa: E402
+
+User = get_user_model()
+
+WORDS = [
+    'борщ', 'суп', 'салат', 'пирог', 'котлеты', 'плов', 'блины', 'каша',
+    'запеканка', 'омлет', 'рагу', 'гуляш', 'пельмени', 'вареники', 'щи',
+    'окрошка', 'солянка', 'жаркое', 'шарлотка', 'сырники', 'оладьи',
+    'куриный', 'грибной', 'овощной', 'рыбный', 'мясной', 'сладкий',
+    'домашний', 'быстрый', 'праздничный', 'картофель', 'морковь', 'лук',
+    'капуста', 'свекла', 'говядина', 'свинина', 'курица', 'сметана',
+    'творог', 'яблоко', 'тыква', 'фасоль', 'рис', 'гречка', 'сыр',
+]
+DEFAULT_TERMS = ['борщ', 'грибной суп', 'шарлотка', 'картоф', 'боршч']
+
+
+class SearchView:
+    search_fields = ['name']
+
+
+def seed(recipes, ingredients_per_recipe):
+    author = User.objects.create_user(
+        email='benchmark@foodgram.local',
+        username='benchmark',
+        first_name='benchmark',
+        last_name='benchmark',
+        password=None,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            INSERT INTO recipes_ingredient (name, measurement_unit)
+            SELECT w || ' ' || i, 'г'
+            FROM unnest(%s::text[]) AS w, generate_series(1, 40) AS i
+            ON CONFLICT (name) DO NOTHING
+            ''',
+            [WORDS],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO recipes_recipe
+                (author_id, name, image, image_variants, text, cooking_time,
+                 favorites_count, updated_at)
+            SELECT
+                %s,
+                w[1 + floor(random() * n)::int] || ' '
+                    || w[1 + floor(random() * n)::int] || ' ' || i,
+                'recipes_images/benchmark.png',
+                '{}'::jsonb,
+                repeat(w[1 + floor(random() * n)::int] || ' ', 20),
+                1 + i %% 120,
+                0,
+                now()
+            FROM generate_series(1, %s) AS i,
+                (SELECT %s::text[] AS w, cardinality(%s::text[]) AS n) AS v
+            ''',
+            [author.pk, recipes, WORDS, WORDS],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO recipes_recipeingredient
+                (recipe_id, ingredient_id, amount)
+            SELECT
+                r.id,
+                v.ids[1 + (r.id * 7919 + j * 104729) %% v.n],
+                1 + r.id %% 500
+            FROM recipes_recipe AS r,
+                generate_series(1, %s) AS j,
+                (
+                    SELECT array_agg(id) AS ids, count(*) AS n
+                    FROM recipes_ingredient
+                ) AS v
+            WHERE r.author_id = %s
+            ''',
+            [ingredients_per_recipe, author.pk],
+        )
+    Recipe.objects.filter(author=author).update_search_vector()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE recipes_recipe')
+        cursor.execute('ANALYZE recipes_recipeingredient')
+
+
+def measure(backend, view, term, page_size, repeat):
+    request = Request(APIRequestFactory().get('/', {'search': term}))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        queryset = backend.filter_queryset(
+            request, Recipe.objects.all(), view
+        )
+        count = queryset.count()
+        list(queryset.values_list('id', flat=True)[:page_size])
+        timings.append((time.perf_counter() - started) * 1000)
+    return count, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнение ILIKE и полнотекстового поиска рецептов'
+    )
+    parser.add_argument('--recipes', type=int, default=1_000_000)
+    parser.add_argument('--ingredients-per-recipe', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=6)
+    parser.add_argument('--terms', nargs='+', default=DEFAULT_TERMS)
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Не откатывать сгенерированные данные',
+    )
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        started = time.perf_counter()
+        seed(args.recipes, args.ingredients_per_recipe)
+        print(
+            f'Сгенерировано {args.recipes} рецептов '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+        print(f'{"запрос":<16}{"ILIKE, мс":>12}{"найдено":>10}'
+              f'{"FTS, мс":>12}{"найдено":>10}')
+        for term in args.terms:
+            ilike_count, ilike_ms = measure(
+                SearchFilter(), SearchView(), term,
+                args.page_size, args.repeat,
+            )
+            fts_count, fts_ms = measure(
+                RecipeSearchFilter(), SearchView(), term,
+                args.page_size, args.repeat,
+            )
+            print(f'{term:<16}{ilike_ms:>12.1f}{ilike_count:>10}'
+                  f'{fts_ms:>12.1f}{fts_count:>10}')
+        if not args.keep:
+            transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
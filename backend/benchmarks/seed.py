@@ -0,0 +1,388 @@
+import argparse
+import json
+import os
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.files.base import ContentFile  # noqa: E402
+from django.core.files.storage import default_storage  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from PIL import Image  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from api.ingredient_index import ingredient_index  # noqa: E402
+from benchmarks.recipe_search import WORDS  # noqa: E402
+from recipes.models import (  # noqa: E402
+    CatalogVersion,
+    FavoriteRecipe,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+    Tag,
+)
+from users.models import Subscription  # noqa: E402
+
+User = get_user_model()
+
+EMAIL_DOMAIN = 'benchmark.foodgram.local'
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+UNITS = ['г', 'кг', 'мл', 'л', 'шт.', 'ст. л.', 'ч. л.', 'по вкусу']
+TABLES = {
+    'users': User._meta.db_table,
+    'tokens': Token._meta.db_table,
+    'tags': Tag._meta.db_table,
+    'ingredients': Ingredient._meta.db_table,
+    'recipes': Recipe._meta.db_table,
+    'recipe_tags': Recipe.tags.through._meta.db_table,
+    'recipe_ingredients': RecipeIngredient._meta.db_table,
+    'favorites': FavoriteRecipe._meta.db_table,
+    'carts': ShoppingCart._meta.db_table,
+    'subscriptions': Subscription._meta.db_table,
+}
+
+
+def execute(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(**TABLES), params)
+        return cursor.rowcount
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new('RGB', (600, 400), (214, 123, 64)).save(buffer, 'PNG')
+    return default_storage.save(
+        'recipes_images/benchmark.png', ContentFile(buffer.getvalue())
+    )
+
+
+def seed_users(prefix, users):
+    return execute(
+        '''
+        INSERT INTO {users} (
+            password, is_superuser, username, first_name, last_name,
+            email, is_staff, is_active, date_joined, recipes_count
+        )
+        SELECT
+            '!', false, %(prefix)s || i, 'Имя ' || i, 'Фамилия ' || i,
+            %(prefix)s || i || '@' || %(domain)s, false, true, now(), 0
+        FROM generate_series(1, %(users)s) AS i
+        ''',
+        {'prefix': prefix, 'domain': EMAIL_DOMAIN, 'users': users},
+    )
+
+
+def seed_tokens(user_ids):
+    execute(
+        '''
+        INSERT INTO {tokens} (key, user_id, created)
+        SELECT
+            substr(md5(random()::text) || md5(random()::text), 1, 40),
+            id,
+            now()
+        FROM unnest(%s::bigint[]) AS id
+        ON CONFLICT (user_id) DO NOTHING
+        ''',
+        [user_ids],
+    )
+    return list(
+        Token.objects.filter(user_id__in=user_ids).values_list(
+            'key', flat=True
+        )
+    )
+
+
+def seed_catalogs(prefix, tags, ingredients):
+    execute(
+        '''
+        INSERT INTO {tags} (name, slug)
+        SELECT %(prefix)s || ' тэг ' || i, %(prefix)s || '-tag-' || i
+        FROM generate_series(1, %(tags)s) AS i
+        ON CONFLICT DO NOTHING
+        ''',
+        {'prefix': prefix, 'tags': tags},
+    )
+    execute(
+        '''
+        INSERT INTO {ingredients} (name, measurement_unit)
+        SELECT
+            w[1 + i %% cardinality(w)] || ' ' || %(prefix)s || ' ' || i,
+            u[1 + i %% cardinality(u)]
+        FROM generate_series(1, %(ingredients)s) AS i,
+            (SELECT %(words)s::text[] AS w, %(units)s::text[] AS u) AS v
+        ON CONFLICT (name) DO NOTHING
+        ''',
+        {
+            'prefix': prefix,
+            'ingredients': ingredients,
+            'words': WORDS,
+            'units': UNITS,
+        },
+    )
+
+
+def seed_recipes(user_ids, recipes, image):
+    return execute(
+        '''
+        INSERT INTO {recipes} (
+            author_id, name, image, image_variants, text, cooking_time,
+            favorites_count, updated_at
+        )
+        SELECT
+            a.ids[1 + floor(a.n * power(random(), 3))::int],
+            v.w[1 + floor(random() * v.n)::int] || ' '
+                || v.w[1 + floor(random() * v.n)::int] || ' ' || i,
+            %(image)s,
+            '{{}}'::jsonb,
+            repeat(v.w[1 + floor(random() * v.n)::int] || ' ', 20),
+            1 + i %% 120,
+            0,
+            now()
+        FROM generate_series(1, %(recipes)s) AS i,
+            (
+                SELECT %(words)s::text[] AS w,
+                    cardinality(%(words)s::text[]) AS n
+            ) AS v,
+            (
+                SELECT %(authors)s::bigint[] AS ids,
+                    cardinality(%(authors)s::bigint[]) AS n
+            ) AS a
+        ''',
+        {
+            'image': image,
+            'recipes': recipes,
+            'words': WORDS,
+            'authors': user_ids,
+        },
+    )
+
+
+def seed_recipe_relations(prefix, user_ids, options):
+    recipe_ids = '''
+        SELECT array_agg(r.id ORDER BY r.id) AS ids, count(*) AS n
+        FROM {recipes} AS r
+        WHERE r.author_id = ANY(%(users)s)
+    '''
+    params = {
+        'users': user_ids,
+        'prefix': prefix,
+        'ingredients': options.ingredients_per_recipe,
+        'tags': options.tags_per_recipe,
+        'favorites': options.favorites_per_user,
+        'cart': options.cart_per_user,
+        'subscriptions': options.subscriptions_per_user,
+    }
+    execute(
+        '''
+        INSERT INTO {recipe_ingredients} (recipe_id, ingredient_id, amount)
+        SELECT r.id, v.ids[1 + (r.id * 7919 + j * 104729) %% v.n],
+            1 + floor(random() * 500)::int
+        FROM {recipes} AS r,
+            generate_series(1, %(ingredients)s) AS j,
+            (
+                SELECT array_agg(id) AS ids, count(*) AS n
+                FROM {ingredients}
+                WHERE name LIKE '%% ' || %(prefix)s || ' %%'
+            ) AS v
+        WHERE r.author_id = ANY(%(users)s)
+        ''',
+        params,
+    )
+    execute(
+        '''
+        INSERT INTO {recipe_tags} (recipe_id, tag_id)
+        SELECT r.id, v.ids[1 + floor(random() * v.n)::int]
+        FROM {recipes} AS r,
+            generate_series(1, %(tags)s) AS j,
+            (
+                SELECT array_agg(id) AS ids, count(*) AS n
+                FROM {tags}
+                WHERE slug LIKE %(prefix)s || '-tag-%%'
+            ) AS v
+        WHERE r.author_id = ANY(%(users)s)
+        ON CONFLICT DO NOTHING
+        ''',
+        params,
+    )
+    for table, limit in (('favorites', 'favorites'), ('carts', 'cart')):
+        execute(
+            f'''
+            INSERT INTO {{{table}}} (user_id, recipe_id)
+            SELECT u, v.ids[1 + floor(v.n * power(random(), 2))::int]
+            FROM unnest(%(users)s::bigint[]) AS u,
+                generate_series(1, %({limit})s) AS j,
+                ({recipe_ids}) AS v
+            WHERE v.n > 0
+            ON CONFLICT DO NOTHING
+            ''',
+            params,
+        )
+    execute(
+        '''
+        INSERT INTO {subscriptions} (user_id, author_id)
+        SELECT * FROM (
+            SELECT u, v.ids[1 + floor(v.n * power(random(), 3))::int] AS a
+            FROM unnest(%(users)s::bigint[]) AS u,
+                generate_series(1, %(subscriptions)s) AS j,
+                (
+                    SELECT array_agg(DISTINCT author_id) AS ids,
+                        count(DISTINCT author_id) AS n
+                    FROM {recipes}
+                    WHERE author_id = ANY(%(users)s)
+                ) AS v
+        ) AS p
+        WHERE p.u <> p.a
+        ON CONFLICT DO NOTHING
+        ''',
+        params,
+    )
+
+
+def finish(user_ids, recipes, image):
+    default_storage.acquire(image, count=recipes)
+    execute(
+        '''
+        UPDATE {users} AS u
+        SET recipes_count = c.count
+        FROM (
+            SELECT author_id, count(*) AS count
+            FROM {recipes}
+            WHERE author_id = ANY(%s)
+            GROUP BY author_id
+        ) AS c
+        WHERE u.id = c.author_id
+        ''',
+        [user_ids],
+    )
+    Recipe.objects.filter(author_id__in=user_ids).update_search_vector()
+    Recipe.objects.sync_favorites_count()
+    ShoppingListItem.objects.rebuild()
+    CatalogVersion.objects.bump(Tag)
+    CatalogVersion.objects.bump(Ingredient)
+    transaction.on_commit(ingredient_index.build)
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        for table in TABLES.values():
+            cursor.execute(f'ANALYZE {table}')
+
+
+def clear(prefix):
+    users = User.objects.filter(
+        username__startswith=prefix, email__endswith=f'@{EMAIL_DOMAIN}'
+    )
+    deleted, _ = users.delete()
+    Tag.objects.filter(slug__startswith=f'{prefix}-tag-').delete()
+    Ingredient.objects.filter(name__contains=f' {prefix} ').delete()
+    return deleted
+
+
+def write_manifest(path, prefix, options, tokens, user_ids):
+    recipe_ids = list(
+        Recipe.objects.filter(author_id__in=user_ids).order_by(
+            '?'
+        ).values_list('id', flat=True)[:options.sample]
+    )
+    manifest = {
+        'prefix': prefix,
+        'scale': {
+            key: value for key, value in vars(options).items()
+            if isinstance(value, int) and not isinstance(value, bool)
+        },
+        'tokens': tokens,
+        'user_ids': user_ids[:options.sample],
+        'recipe_ids': recipe_ids,
+        'tags': list(
+            Tag.objects.filter(
+                slug__startswith=f'{prefix}-tag-'
+            ).values_list('slug', flat=True)
+        ),
+        'search_terms': WORDS,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Генерация синтетических данных для нагрузочных тестов'
+    )
+    parser.add_argument('--prefix', default='bench')
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--recipes', type=int, default=50_000)
+    parser.add_argument('--ingredients', type=int, default=2_000)
+    parser.add_argument('--tags', type=int, default=8)
+    parser.add_argument('--ingredients-per-recipe', type=int, default=6)
+    parser.add_argument('--tags-per-recipe', type=int, default=2)
+    parser.add_argument('--favorites-per-user', type=int, default=20)
+    parser.add_argument('--cart-per-user', type=int, default=3)
+    parser.add_argument('--subscriptions-per-user', type=int, default=5)
+    parser.add_argument(
+        '--tokens',
+        type=int,
+        default=200,
+        help='Количество пользователей, для которых выпускаются токены',
+    )
+    parser.add_argument(
+        '--sample',
+        type=int,
+        default=5_000,
+        help='Сколько идентификаторов сохранить в манифест',
+    )
+    parser.add_argument(
+        '--manifest',
+        type=Path,
+        default=RESULTS_DIR / 'dataset.json',
+        help='Файл с токенами и идентификаторами для load.py',
+    )
+    parser.add_argument(
+        '--clear',
+        action='store_true',
+        help='Удалить ранее сгенерированные данные с тем же префиксом',
+    )
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        if args.clear:
+            started = time.perf_counter()
+            deleted = clear(args.prefix)
+            print(
+                f'Удалено объектов: {deleted} '
+                f'за {time.perf_counter() - started:.1f} с'
+            )
+        started = time.perf_counter()
+        seed_users(args.prefix, args.users)
+        user_ids = list(
+            User.objects.filter(
+                username__startswith=args.prefix,
+                email__endswith=f'@{EMAIL_DOMAIN}',
+            ).order_by('id').values_list('id', flat=True)
+        )
+        tokens = seed_tokens(user_ids[:args.tokens])
+        seed_catalogs(args.prefix, args.tags, args.ingredients)
+        image = make_image()
+        recipes = seed_recipes(user_ids, args.recipes, image)
+        seed_recipe_relations(args.prefix, user_ids, args)
+        finish(user_ids, recipes, image)
+        write_manifest(args.manifest, args.prefix, args, tokens, user_ids)
+    analyze()
+    print(
+        f'Сгенерировано {len(user_ids)} пользователей и {recipes} рецептов '
+        f'за {time.perf_counter() - started:.1f} с, '
+        f'манифест: {args.manifest}'
+    )
+
+
+if __name__ == '__main__':
+    main()
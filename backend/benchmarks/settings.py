@@ -0,0 +1,4 @@
+from foodgram.settings import *  # noqa: F401,F403
+from foodgram.settings import MIDDLEWARE
+
+MIDDLEWARE = ['benchmarks.middleware.QueryCountMiddleware', *MIDDLEWARE]
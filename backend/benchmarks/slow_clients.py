@@ -0,0 +1,231 @@
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from load import (
+    MIXES,
+    RESULTS_DIR,
+    SCENARIOS,
+    VirtualUser,
+    get_commit,
+    start_server,
+    summarize,
+)
+
+
+class SlowClient(threading.Thread):
+    def __init__(self, base_url, dataset, deadline, send_time, chunks, seed):
+        super().__init__(daemon=True)
+        address = urlsplit(base_url)
+        self.host = address.hostname
+        self.port = address.port or 80
+        self.dataset = dataset
+        self.deadline = deadline
+        self.send_time = send_time
+        self.chunks = chunks
+        self.rng = random.Random(seed)
+        self.completed = 0
+        self.failed = 0
+
+    def build_request(self):
+        path = SCENARIOS['recipes_page'][0](self.dataset, self.rng)
+        return (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {self.host}:{self.port}\r\n'
+            'Accept: application/json\r\n'
+            f'X-Padding: {"x" * 256}\r\n'
+            'Connection: close\r\n\r\n'
+        ).encode()
+
+    def request(self):
+        payload = self.build_request()
+        step = max(1, len(payload) // self.chunks)
+        pause = self.send_time / self.chunks
+        timeout = self.send_time + 30
+        with socket.create_connection((self.host, self.port), timeout) as conn:
+            for offset in range(0, len(payload), step):
+                conn.sendall(payload[offset:offset + step])
+                time.sleep(pause)
+            status = conn.recv(12)
+            while conn.recv(65536):
+                pass
+        return status.startswith(b'HTTP/1.1 2')
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            try:
+                succeeded = self.request()
+            except OSError:
+                succeeded = False
+            if succeeded:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+
+def run(args, dataset, base_url):
+    started = time.monotonic()
+    deadline = started + args.warmup + args.duration
+    tokens = dataset['tokens']
+    slow_clients = [
+        SlowClient(
+            base_url,
+            dataset,
+            deadline,
+            args.send_time,
+            args.chunks,
+            args.seed + number,
+        )
+        for number in range(args.slow_clients)
+    ]
+    users = [
+        VirtualUser(
+            base_url,
+            dataset,
+            MIXES[args.mix],
+            tokens[number % len(tokens)] if tokens else None,
+            deadline,
+            args.timeout,
+            args.seed + args.slow_clients + number,
+        )
+        for number in range(args.concurrency)
+    ]
+    for client in slow_clients:
+        client.start()
+    time.sleep(min(args.warmup, args.send_time))
+    for user in users:
+        user.start()
+    for thread in [*users, *slow_clients]:
+        thread.join()
+    measured_from = started + args.warmup
+    samples = [
+        sample for user in users for sample in user.samples
+        if sample[1] >= measured_from
+    ]
+    summary = summarize(samples, time.monotonic() - measured_from)
+    summary['slow_clients'] = {
+        'completed': sum(client.completed for client in slow_clients),
+        'failed': sum(client.failed for client in slow_clients),
+    }
+    return summary
+
+
+def print_report(results):
+    print(
+        f'{"режим":<10}{"запросов":>10}{"ошибок":>8}{"rps":>9}'
+        f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        f'{"медленных":>11}'
+    )
+    for mode, summary in results.items():
+        latency = summary['latency_ms']
+        slow = summary['slow_clients']
+        print(
+            f'{mode:<10}{summary["requests"]:>10}{summary["errors"]:>8}'
+            f'{summary["throughput"]:>9.1f}{latency["p50"] or 0:>10.1f}'
+            f'{latency["p95"] or 0:>10.1f}{latency["p99"] or 0:>10.1f}'
+            f'{slow["completed"]:>6}/{slow["failed"]:<4}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            'Задержки обычных клиентов API, пока часть соединений '
+            'занята медленными клиентами: синхронный gunicorn против ASGI'
+        )
+    )
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument(
+        '--modes',
+        nargs='+',
+        choices=('wsgi', 'asgi'),
+        default=['wsgi', 'asgi'],
+        help='Режимы, для которых по очереди запускается gunicorn',
+    )
+    parser.add_argument(
+        '--no-start-server',
+        action='store_true',
+        help='Не запускать gunicorn, измерить уже работающий сервер',
+    )
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mix', choices=MIXES, default='browse')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument(
+        '--slow-clients',
+        type=int,
+        default=16,
+        help='Число соединений, отправляющих запрос по частям',
+    )
+    parser.add_argument(
+        '--send-time',
+        type=float,
+        default=5,
+        help='За сколько секунд медленный клиент отправляет запрос',
+    )
+    parser.add_argument('--chunks', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=5)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--dataset',
+        type=Path,
+        default=RESULTS_DIR / 'dataset.json',
+        help='Манифест, записанный seed.py',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Файл отчёта, по умолчанию results/slow-<время>-<коммит>.json',
+    )
+    args = parser.parse_args()
+
+    dataset = json.loads(args.dataset.read_text())
+    base_url = args.base_url.rstrip('/')
+    modes = ['external'] if args.no_start_server else args.modes
+    started_at = datetime.now(timezone.utc)
+    results = {}
+    for mode in modes:
+        server = None
+        if not args.no_start_server:
+            server = start_server(base_url, args.workers, mode)
+        try:
+            results[mode] = run(args, dataset, base_url)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print_report(results)
+    commit = get_commit()
+    report = {
+        'commit': commit,
+        'started_at': started_at.isoformat(),
+        'base_url': args.base_url,
+        'mix': args.mix,
+        'weights': MIXES[args.mix],
+        'concurrency': args.concurrency,
+        'slow_clients': args.slow_clients,
+        'send_time': args.send_time,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'workers': None if args.no_start_server else args.workers,
+        'dataset': dataset['scale'],
+        'results': results,
+    }
+    output = args.output or RESULTS_DIR / (
+        f'slow-{started_at:%Y%m%d-%H%M%S}-{commit or "unknown"}.json'
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f'Отчёт сохранён в {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Blob
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'references_count',
+        'created_at',
+    )
+    search_fields = (
+        'name',
+    )
+    readonly_fields = (
+        'name',
+        'references_count',
+        'created_at',
+    )
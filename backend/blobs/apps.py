@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class BlobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'blobs'
+    verbose_name = 'Медиафайлы'
+
+    def ready(self):
+        from .signals import connect_tracked_models
+        connect_tracked_models()
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blobs.models import Blob
+from blobs.signals import tracked_fields
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит загруженные файлы в хранилище с адресацией по содержимому'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только посчитать файлы, которые еще не перенесены',
+        )
+
+    def get_legacy_names(self, model, field):
+        return model._default_manager.exclude(
+            **{f'{field.attname}__in': Blob.objects.values('name')}
+        ).exclude(
+            **{field.attname: ''}
+        ).exclude(
+            **{f'{field.attname}__isnull': True}
+        ).order_by().values_list(field.attname, flat=True).distinct()
+
+    def convert(self, model, field, name):
+        storage = field.storage
+        with storage.open(name) as file:
+            converted = storage.save(name, file)
+        with transaction.atomic():
+            updated = model._default_manager.filter(
+                **{field.attname: name}
+            ).update(**{field.attname: converted})
+            if updated:
+                storage.acquire(converted, updated)
+        storage.delete(name)
+
+    def handle(self, *args, **options):
+        converted = missing = 0
+        for model, fields in tracked_fields.items():
+            for field in fields:
+                names = list(self.get_legacy_names(model, field))
+                if options['check']:
+                    converted += len(names)
+                    continue
+                for name in names:
+                    if not field.storage.exists(name):
+                        missing += 1
+                        self.stderr.write(f'Файл не найден: {name}')
+                        continue
+                    self.convert(model, field, name)
+                    converted += 1
+        if options['check']:
+            if converted:
+                raise CommandError(f'Не перенесено файлов: {converted}')
+            self.stdout.write(self.style.SUCCESS('Все файлы перенесены'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {converted}, не найдено: {missing}'
+        ))
@@ -0,0 +1,71 @@
+from django.db import connection, models
+
+
+class BlobManager(models.Manager):
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql.format(blobs=self.model._meta.db_table), params
+            )
+            if cursor.description:
+                row = cursor.fetchone()
+                return row[0] if row else None
+            return cursor.rowcount
+
+    def acquire(self, name, count=1):
+        self._execute(
+            '''
+            INSERT INTO {blobs} (name, references_count, created_at)
+            VALUES (%s, %s, NOW())
+            ON CONFLICT (name) DO UPDATE
+            SET references_count = {blobs}.references_count
+                + EXCLUDED.references_count
+            ''',
+            [name, count],
+        )
+
+    def release(self, name):
+        remaining = self._execute(
+            '''
+            UPDATE {blobs}
+            SET references_count = references_count - 1
+            WHERE name = %s
+            RETURNING references_count
+            ''',
+            [name],
+        )
+        if remaining is None:
+            return True
+        if remaining > 0:
+            return False
+        self._execute(
+            'DELETE FROM {blobs} WHERE name = %s AND references_count <= 0',
+            [name],
+        )
+        return True
+
+
+class Blob(models.Model):
+    name = models.CharField(
+        'Путь',
+        max_length=255,
+        unique=True
+    )
+    references_count = models.PositiveIntegerField(
+        'Ссылок',
+        default=0
+    )
+    created_at = models.DateTimeField(
+        'Создан',
+        auto_now_add=True
+    )
+
+    objects = BlobManager()
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return self.name
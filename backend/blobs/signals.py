@@ -0,0 +1,57 @@
+from django.apps import apps
+from django.db import models
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .storage import ContentAddressedStorage
+
+tracked_fields = {}
+
+
+def get_tracked_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def remember_names(sender, instance, **kwargs):
+    instance._blob_names = {
+        field.attname: str(instance.__dict__[field.attname] or '')
+        for field in tracked_fields[sender]
+        if field.attname in instance.__dict__
+    }
+
+
+def update_references(sender, instance, **kwargs):
+    for field in tracked_fields[sender]:
+        if field.attname not in instance._blob_names:
+            continue
+        previous = instance._blob_names[field.attname]
+        current = getattr(instance, field.attname).name or ''
+        if current == previous:
+            continue
+        if current:
+            field.storage.acquire(current)
+        if previous:
+            field.storage.delete(previous)
+        instance._blob_names[field.attname] = current
+
+
+def release_files(sender, instance, **kwargs):
+    for field in tracked_fields[sender]:
+        if field.attname in instance.__dict__:
+            name = getattr(instance, field.attname).name
+            if name:
+                field.storage.delete(name)
+
+
+def connect_tracked_models():
+    for model in apps.get_models():
+        fields = get_tracked_fields(model)
+        if not fields:
+            continue
+        tracked_fields[model] = fields
+        post_init.connect(remember_names, sender=model)
+        post_save.connect(update_references, sender=model)
+        post_delete.connect(release_files, sender=model)
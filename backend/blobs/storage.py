@@ -0,0 +1,61 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+from functools import partial
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from .models import Blob
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest.hexdigest() + extension)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        name = self.get_content_name(name, content)
+        if not self.exists(name):
+            self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as file:
+            for chunk in content.chunks():
+                file.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(tmp_path, self.file_permissions_mode)
+        os.replace(tmp_path, path)
+
+    def acquire(self, name, count=1):
+        Blob.objects.acquire(name, count)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        if Blob.objects.release(name):
+            transaction.on_commit(partial(self.remove, name))
+
+    def remove(self, name):
+        if not Blob.objects.filter(name=name).exists():
+            super().delete(name)
@@ -1,2 +1,16 @@
 MINIMUM_VALUES = 1
 MAXIMUM_VALUES = 32000
+SEARCH_CONFIG = 'russian'
+SHOPPING_LIST_CHUNK_SIZE = 500
+RECIPE_IMAGE_VARIANTS_DIR = 'recipes_images/variants/'
+RECIPE_IMAGE_SIZES = {
+    'thumbnail': (360, 240),
+    'card': (720, 480),
+}
+RECIPE_IMAGE_FORMATS = (
+    ('JPEG', 'jpg'),
+    ('WEBP', 'webp'),
+    ('AVIF', 'avif'),
+)
+AVATAR_SIZE = (256, 256)
+RECIPE_FRAGMENT_TIMEOUT = 60 * 60 * 24
@@ -0,0 +1,40 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db.models import F, Q
+from rest_framework.filters import SearchFilter
+
+from .constants import SEARCH_CONFIG
+
+
+class RecipeSearchFilter(SearchFilter):
+    search_vector_field = 'search_vector'
+    trigram_field = 'name'
+
+    def get_search_query(self, search_terms):
+        words = re.findall(r'\w+', ' '.join(search_terms))
+        if not words:
+            return None
+        return SearchQuery(
+            ' & '.join(f'{word}:*' for word in words),
+            config=SEARCH_CONFIG,
+            search_type='raw',
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        query = self.get_search_query(search_terms)
+        if query is None:
+            return queryset
+        phrase = ' '.join(search_terms)
+        return queryset.annotate(
+            rank=SearchRank(F(self.search_vector_field), query),
+            similarity=TrigramSimilarity(self.trigram_field, phrase),
+        ).filter(
+            Q(**{self.search_vector_field: query})
+            | Q(**{f'{self.trigram_field}__trigram_similar': phrase})
+        ).order_by('-rank', '-similarity', '-id')
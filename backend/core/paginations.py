@@ -1,4 +1,24 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        return [item async for item in self.page.object_list]
 
 
 class UsersListPagination(PageNumberPagination):
@@ -7,7 +27,14 @@ class UsersListPagination(PageNumberPagination):
     max_page_size = 6
 
 
-class RecipesListPagination(PageNumberPagination):
+class RecipesListPagination(AsyncPageNumberPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    max_page_size = 6
+
+
+class RecipesCursorPagination(CursorPagination):
     page_size = 6
     page_size_query_param = 'limit'
     max_page_size = 6
+    ordering = '-id'
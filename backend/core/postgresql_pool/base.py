@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from django.db.backends.postgresql import base, creation
+
+POOL_DEFAULTS = {'max_size': 10, 'timeout': 30, 'max_idle': 300}
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout, max_idle, health_checks):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_checks = health_checks
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.idle = deque()
+        self.lock = threading.Lock()
+
+    def take_idle(self):
+        now = time.monotonic()
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, isolation_level, returned_at = self.idle.pop()
+            if connection.closed or now - returned_at > self.max_idle:
+                connection.close()
+                continue
+            if self.health_checks:
+                try:
+                    connection.autocommit = True
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                    connection.rollback()
+                except base.Database.Error:
+                    connection.close()
+                    continue
+            return connection, isolation_level
+
+    def get(self, connect):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise base.Database.OperationalError(
+                f'Нет свободного соединения в пуле за {self.timeout} с'
+            )
+        try:
+            return self.take_idle() or connect()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def reset(self, connection):
+        connection.rollback()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute('DISCARD ALL')
+
+    def put(self, connection, isolation_level):
+        try:
+            if not connection.closed:
+                self.reset(connection)
+                with self.lock:
+                    self.idle.append(
+                        (connection, isolation_level, time.monotonic())
+                    )
+        except base.Database.Error:
+            connection.close()
+        finally:
+            self.slots.release()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for connection, _, _ in idle:
+            connection.close()
+
+
+def close_pools():
+    with pools_lock:
+        closing = list(pools.values())
+        pools.clear()
+    for pool in closing:
+        pool.close()
+
+
+def forget_pools():
+    global pools_lock
+    pools.clear()
+    pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=forget_pools)
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        key = repr(sorted(conn_params.items()))
+        with pools_lock:
+            pool = pools.get(key)
+            if pool is None:
+                options = {
+                    **POOL_DEFAULTS,
+                    **self.settings_dict['OPTIONS'].get('pool', {}),
+                }
+                pool = pools[key] = ConnectionPool(
+                    health_checks=self.settings_dict['CONN_HEALTH_CHECKS'],
+                    **options,
+                )
+            return pool
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def connect_to_database(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        return connection, self.isolation_level
+
+    @base.async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        connection, self.isolation_level = self.pool.get(
+            partial(self.connect_to_database, conn_params)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.put(self.connection, self.isolation_level)
@@ -0,0 +1,37 @@
+from django.urls import include, path, re_path
+
+from api.async_views import as_async_view
+from api.views import IngredientViewSet, RecipeViewSet, TagViewSet
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}
+
+
+def async_routes(prefix, viewset, basename):
+    return [
+        path(
+            f'api/{prefix}/',
+            as_async_view(
+                viewset, LIST_ACTIONS, basename=basename, detail=False
+            ),
+        ),
+        re_path(
+            rf'^api/{prefix}/(?P<pk>\d+)/$',
+            as_async_view(
+                viewset, DETAIL_ACTIONS, basename=basename, detail=True
+            ),
+        ),
+    ]
+
+
+urlpatterns = [
+    *async_routes('recipes', RecipeViewSet, 'recipe'),
+    *async_routes('tags', TagViewSet, 'tag'),
+    *async_routes('ingredients', IngredientViewSet, 'ingredient'),
+    path('', include('foodgram.urls')),
+]
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 
@@ -20,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'rest_framework',
     'rest_framework.authtoken',
@@ -27,9 +29,14 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'recipes.apps.RecipesConfig',
     'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
+    'blobs.apps.BlobsConfig',
+    'metrics.apps.MetricsConfig',
 ]
 
 MIDDLEWARE = [
+    'metrics.middleware.MetricsMiddleware',
+    'metrics.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,7 +46,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram.urls'
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'foodgram.urls')
 
 TEMPLATES = [
     {
@@ -60,16 +67,37 @@ TEMPLATES = [
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
 
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.postgresql_pool' if DB_POOL_MAX_SIZE
+            else 'django.db.backends.postgresql'
+        ),
         'NAME': os.environ.get('POSTGRES_DB', 'db_name'),
         'USER': os.environ.get('POSTGRES_USER', 'db_user'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'db_pass'),
         'HOST': os.environ.get('DB_HOST', 'db'),
         'PORT': '5432',
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_MAX_SIZE
+            else int(os.environ.get('DB_CONN_MAX_AGE', 60))
+        ),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', 'true'
+        ).lower() in ('1', 'true', 'yes'),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
+if DB_POOL_MAX_SIZE:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+    }
 
 
 # DATABASES = {
@@ -110,6 +138,60 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = 'media'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'blobs.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+}
+
+SHOPPING_LIST_FONT = os.environ.get(
+    'SHOPPING_LIST_FONT',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+)
+
+INGREDIENT_INDEX_PATH = os.environ.get(
+    'INGREDIENT_INDEX_PATH',
+    BASE_DIR / 'ingredient_index.bin',
+)
+INGREDIENT_INDEX_REFRESH_INTERVAL = int(
+    os.environ.get('INGREDIENT_INDEX_REFRESH_INTERVAL', 3600)
+)
+
+METRICS_DIR = os.environ.get(
+    'METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'foodgram-metrics'),
+)
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+CATALOG_VERSION_CACHE_TTL = int(
+    os.environ.get('CATALOG_VERSION_CACHE_TTL', 60)
+)
+
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 1024))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 30))
+AUTH_TOKEN_CACHE_SHARED = os.environ.get(
+    'AUTH_TOKEN_CACHE_SHARED', ''
+).lower() in ('1', 'true', 'yes')
+
+NPLUSONE_MODE = os.environ.get('NPLUSONE_MODE', 'sampled')
+NPLUSONE_SAMPLE_RATE = float(os.environ.get('NPLUSONE_SAMPLE_RATE', 0.01))
+NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', 5))
+NPLUSONE_IGNORE = [r'\bblobs_blob\b']
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -119,7 +201,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
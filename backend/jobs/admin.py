@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_at',
+        'duration',
+    )
+    search_fields = (
+        'name',
+    )
+    list_filter = (
+        'status',
+        'name',
+    )
+    readonly_fields = (
+        'created_at',
+        'started_at',
+        'heartbeat_at',
+        'finished_at',
+        'duration',
+        'last_error',
+    )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику выполнения фоновых задач'
+
+    def handle(self, *args, **options):
+        stats = Job.objects.values('name').annotate(
+            total=Count('id'),
+            queued=Count('id', filter=Q(status=Job.QUEUED)),
+            failed=Count('id', filter=Q(status=Job.FAILED)),
+            average=Avg('duration', filter=Q(status=Job.DONE)),
+            slowest=Max('duration', filter=Q(status=Job.DONE)),
+        ).order_by('name')
+        self.stdout.write(
+            f'{"задача":<32}{"всего":>8}{"в очереди":>11}{"ошибок":>8}'
+            f'{"среднее, с":>12}{"макс, с":>10}'
+        )
+        for row in stats:
+            self.stdout.write(
+                f'{row["name"]:<32}{row["total"]:>8}{row["queued"]:>11}'
+                f'{row["failed"]:>8}{row["average"] or 0:>12.3f}'
+                f'{row["slowest"] or 0:>10.3f}'
+            )
@@ -0,0 +1,80 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import Worker
+
+DAY = 24 * 3600
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчик фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Количество параллельных потоков',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Пауза между опросами пустой очереди, с',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=float,
+            default=5.0,
+            help='Начальная задержка перед повтором, с',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=120,
+            help='Через сколько секунд без сигнала задача снова берется',
+        )
+        parser.add_argument(
+            '--heartbeat-interval',
+            type=float,
+            default=30.0,
+            help='Как часто выполняемые задачи отмечаются живыми, с',
+        )
+        parser.add_argument(
+            '--keep-done',
+            type=float,
+            default=7,
+            help='Сколько дней хранить выполненные задачи',
+        )
+        parser.add_argument(
+            '--keep-failed',
+            type=float,
+            default=30,
+            help='Сколько дней хранить задачи с ошибкой',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Выполнить задачи из очереди и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            backoff=options['backoff'],
+            stale_after=options['stale_after'],
+            heartbeat_interval=options['heartbeat_interval'],
+            keep_done=options['keep_done'] * DAY,
+            keep_failed=options['keep_failed'] * DAY,
+        )
+        if options['burst']:
+            processed = worker.run_burst()
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+        signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+        self.stdout.write(
+            f'Обработчик запущен, потоков: {options["concurrency"]}'
+        )
+        worker.run()
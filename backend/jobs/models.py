@@ -0,0 +1,85 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        'Задача',
+        max_length=255
+    )
+    payload = models.JSONField(
+        'Параметры',
+        default=dict,
+        blank=True
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток',
+        default=0
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток',
+        default=5
+    )
+    run_at = models.DateTimeField(
+        'Запустить после',
+        default=timezone.now
+    )
+    created_at = models.DateTimeField(
+        'Создана',
+        auto_now_add=True
+    )
+    started_at = models.DateTimeField(
+        'Начата',
+        null=True,
+        blank=True
+    )
+    heartbeat_at = models.DateTimeField(
+        'Последний сигнал',
+        null=True,
+        blank=True
+    )
+    finished_at = models.DateTimeField(
+        'Завершена',
+        null=True,
+        blank=True
+    )
+    duration = models.FloatField(
+        'Длительность, с',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='job_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(name, max_attempts=5):
+    def decorator(func):
+        registry[name] = (func, max_attempts)
+        func.enqueue = lambda **payload: enqueue(name, **payload)
+        return func
+    return decorator
+
+
+def enqueue(name, /, run_at=None, **payload):
+    if name not in registry:
+        raise KeyError(f'Задача {name} не зарегистрирована')
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=registry[name][1],
+        run_at=run_at or timezone.now(),
+    )
+
+
+def prune(keep_done, keep_failed, batch_size=1000):
+    now = timezone.now()
+    deleted = 0
+    for status, keep in ((Job.DONE, keep_done), (Job.FAILED, keep_failed)):
+        expired = Job.objects.filter(
+            status=status, finished_at__lt=now - timedelta(seconds=keep)
+        )
+        while True:
+            batch = list(expired.values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += Job.objects.filter(pk__in=batch).delete()[0]
+    return deleted
+
+
+class Worker:
+    def __init__(
+        self,
+        concurrency=1,
+        poll_interval=1.0,
+        backoff=5.0,
+        stale_after=120,
+        heartbeat_interval=30.0,
+        keep_done=7 * 24 * 3600,
+        keep_failed=30 * 24 * 3600,
+        prune_interval=3600,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self.keep_done = keep_done
+        self.keep_failed = keep_failed
+        self.prune_interval = prune_interval
+        self.stopping = threading.Event()
+        self.running = set()
+        self.running_lock = threading.Lock()
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            job = Job.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Job.QUEUED, run_at__lte=now)
+                | Q(
+                    status=Job.RUNNING,
+                    heartbeat_at__lt=now - timedelta(
+                        seconds=self.stale_after
+                    ),
+                )
+            ).order_by('run_at', 'id').first()
+            if job is None:
+                return None
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.started_at = now
+            job.heartbeat_at = now
+            job.save(update_fields=[
+                'status', 'attempts', 'started_at', 'heartbeat_at'
+            ])
+        return job
+
+    def execute(self, job):
+        started = time.perf_counter()
+        claim = (job.pk, job.attempts)
+        with self.running_lock:
+            self.running.add(claim)
+        try:
+            func, _ = registry[job.name]
+            func(**job.payload)
+        except Exception:
+            job.last_error = traceback.format_exc()
+            if job.attempts < job.max_attempts:
+                job.status = Job.QUEUED
+                job.run_at = timezone.now() + timedelta(
+                    seconds=self.backoff * 2 ** (job.attempts - 1)
+                )
+            else:
+                job.status = Job.FAILED
+            logger.warning('Задача %s завершилась ошибкой', job)
+        else:
+            job.status = Job.DONE
+        finally:
+            with self.running_lock:
+                self.running.discard(claim)
+        job.duration = time.perf_counter() - started
+        job.finished_at = timezone.now()
+        # Задачу с пропавшим сигналом мог перехватить другой обработчик:
+        # результат записывается, только если попытка всё ещё наша.
+        updated = Job.objects.filter(
+            pk=job.pk, status=Job.RUNNING, attempts=job.attempts
+        ).update(
+            status=job.status,
+            run_at=job.run_at,
+            duration=job.duration,
+            finished_at=job.finished_at,
+            last_error=job.last_error,
+        )
+        if not updated:
+            logger.warning(
+                'Задача %s перехвачена другим обработчиком, '
+                'результат попытки %s не сохранён',
+                job,
+                job.attempts,
+            )
+
+    def beat(self):
+        with self.running_lock:
+            running = list(self.running)
+        if running:
+            claims = Q()
+            for pk, attempts in running:
+                claims |= Q(pk=pk, attempts=attempts)
+            Job.objects.filter(claims, status=Job.RUNNING).update(
+                heartbeat_at=timezone.now()
+            )
+
+    def heartbeat(self):
+        pruned_at = None
+        try:
+            while not self.stopping.wait(self.heartbeat_interval):
+                close_old_connections()
+                try:
+                    self.beat()
+                    now = time.monotonic()
+                    if (
+                        pruned_at is None
+                        or now - pruned_at >= self.prune_interval
+                    ):
+                        prune(self.keep_done, self.keep_failed)
+                        pruned_at = now
+                except Exception:
+                    logger.exception('Не удалось обновить сигнал задач')
+        finally:
+            connection.close()
+
+    def run_once(self):
+        close_old_connections()
+        job = self.claim()
+        if job is None:
+            return False
+        self.execute(job)
+        return True
+
+    def loop(self):
+        try:
+            while not self.stopping.is_set():
+                if not self.run_once():
+                    self.stopping.wait(self.poll_interval)
+        finally:
+            connection.close()
+
+    def run(self):
+        heartbeat = threading.Thread(
+            target=self.heartbeat, name='jobs-heartbeat'
+        )
+        heartbeat.start()
+        threads = [
+            threading.Thread(target=self.loop, name=f'jobs-worker-{number}')
+            for number in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.stop()
+            heartbeat.join()
+
+    def run_burst(self):
+        heartbeat = threading.Thread(
+            target=self.heartbeat, name='jobs-heartbeat'
+        )
+        heartbeat.start()
+        processed = 0
+        try:
+            while self.run_once():
+                processed += 1
+        finally:
+            self.stop()
+            heartbeat.join()
+        return processed
+
+    def stop(self):
+        self.stopping.set()
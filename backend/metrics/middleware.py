@@ -0,0 +1,139 @@
+import random
+import re
+import time
+from contextlib import ExitStack
+from functools import partial
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .nplusone import RepeatedQueryDetector
+from .registry import registry
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def get_view_name(request):
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    view_func = match.func
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return f'{view_func.__module__}.{view_func.__qualname__}'
+    method = request.method.lower()
+    action = (getattr(view_func, 'actions', None) or {}).get(method)
+    return f'{view_class.__name__}.{action or method}'
+
+
+class ExecuteWrapperMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def get_wrapper(self, request):
+        raise NotImplementedError
+
+    def process_response(self, request, response, wrapper):
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        wrapper = self.get_wrapper(request)
+        if wrapper is None:
+            return self.get_response(request)
+        with connection.execute_wrapper(wrapper):
+            response = self.get_response(request)
+        return self.process_response(request, response, wrapper)
+
+    async def __acall__(self, request):
+        wrapper = self.get_wrapper(request)
+        if wrapper is None:
+            return await self.get_response(request)
+        # Под ASGI запросы к БД выполняются в потоке sync_to_async,
+        # у которого своё соединение, поэтому обёртка ставится там же.
+        wrappers = ExitStack()
+        await sync_to_async(
+            lambda: wrappers.enter_context(connection.execute_wrapper(wrapper))
+        )()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+        return self.process_response(request, response, wrapper)
+
+
+class MetricsMiddleware(ExecuteWrapperMiddleware):
+    def get_wrapper(self, request):
+        counter = QueryCounter()
+        counter.started = time.perf_counter()
+        return counter
+
+    def process_response(self, request, response, counter):
+        match = request.resolver_match
+        if match is not None and getattr(match.func, 'metrics_exempt', False):
+            return response
+        registry.record(
+            get_view_name(request),
+            request.method if request.method in METHODS else 'other',
+            response.status_code,
+            time.perf_counter() - counter.started,
+            counter.count,
+            counter.duration,
+            None if response.streaming else len(response.content),
+        )
+        return response
+
+
+class NPlusOneMiddleware(ExecuteWrapperMiddleware):
+    def __init__(self, get_response):
+        if settings.NPLUSONE_MODE not in ('sampled', 'strict'):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.strict = settings.NPLUSONE_MODE == 'strict'
+        self.ignore = [
+            re.compile(pattern) for pattern in settings.NPLUSONE_IGNORE
+        ]
+
+    def get_wrapper(self, request):
+        if (
+            not self.strict
+            and random.random() >= settings.NPLUSONE_SAMPLE_RATE
+        ):
+            return None
+        return RepeatedQueryDetector(
+            settings.NPLUSONE_THRESHOLD,
+            self.strict,
+            self.ignore,
+            partial(get_view_name, request),
+        )
+
+    def process_response(self, request, response, detector):
+        detector.report()
+        return response
@@ -0,0 +1,78 @@
+import logging
+import re
+import traceback
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+VALUE_LISTS = re.compile(r'(?:%s|\?)(?:\s*,\s*(?:%s|\?))+')
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql):
+    sql = LITERALS.sub('?', sql)
+    sql = VALUE_LISTS.sub('...', sql)
+    return ' '.join(sql.split())
+
+
+def find_origin():
+    project_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(project_dir)
+        and not frame.filename.startswith(PACKAGE_DIR)
+        and 'site-packages' not in frame.filename
+    ]
+    for frame in reversed(frames):
+        if frame.filename.endswith('serializers.py'):
+            break
+    else:
+        if not frames:
+            return None
+        frame = frames[-1]
+    filename = Path(frame.filename).relative_to(project_dir)
+    return f'{filename}:{frame.lineno} в {frame.name}'
+
+
+class RepeatedQueryDetector:
+    def __init__(self, threshold, strict=False, ignore=(), get_view=None):
+        self.threshold = threshold
+        self.strict = strict
+        self.ignore = ignore
+        self.get_view = get_view or (lambda: 'unmatched')
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = normalize(sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold + 1 and not any(
+            pattern.search(shape) for pattern in self.ignore
+        ):
+            self.origins[shape] = find_origin()
+            if self.strict:
+                raise NPlusOneError(
+                    f'{self.get_view()}: запрос повторён больше '
+                    f'{self.threshold} раз из {self.origins[shape]}: {shape}'
+                )
+        return execute(sql, params, many, context)
+
+    def report(self):
+        for shape, origin in self.origins.items():
+            logger.warning(
+                'N+1 в %s: запрос повторён %s раз из %s: %s',
+                self.get_view(),
+                self.counts[shape],
+                origin,
+                shape,
+            )
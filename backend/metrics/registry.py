@@ -0,0 +1,250 @@
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+RETIRED = 'retired.json'
+
+METRICS = {
+    'foodgram_http_requests_total': (
+        COUNTER, 'Количество обработанных запросов', None,
+    ),
+    'foodgram_http_request_duration_seconds': (
+        HISTOGRAM, 'Время обработки запроса', DURATION_BUCKETS,
+    ),
+    'foodgram_http_response_size_bytes': (
+        HISTOGRAM, 'Размер тела ответа', SIZE_BUCKETS,
+    ),
+    'foodgram_db_queries': (
+        HISTOGRAM, 'Количество SQL-запросов на один запрос', QUERY_BUCKETS,
+    ),
+    'foodgram_db_query_duration_seconds_total': (
+        COUNTER, 'Суммарное время выполнения SQL-запросов', None,
+    ),
+}
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{escape(value)}"' for key, value in labels)
+    return f'{{{pairs}}}'
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def process_start(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as file:
+            stat = file.read()
+    except OSError:
+        return ''
+    return stat.rsplit(')', 1)[1].split()[19]
+
+
+def is_running(pid, started):
+    if started:
+        return process_start(pid) == started
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_snapshot(path):
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError):
+        return None
+
+
+def merge(totals, snapshot):
+    for name, labels, value in snapshot:
+        if name not in METRICS:
+            continue
+        key = (name, tuple(tuple(pair) for pair in labels))
+        if isinstance(value, list):
+            total = totals.setdefault(key, [0] * len(value))
+            for index, item in enumerate(value):
+                total[index] += item
+        else:
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def write_snapshot(directory, name, snapshot):
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        file.write(snapshot)
+    os.replace(tmp_path, directory / name)
+
+
+class Registry:
+    def __init__(self, directory=None):
+        self._directory = directory
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.values = {}
+        self.flushed_at = 0.0
+        self.process = None
+        atexit.register(self.flush)
+
+    @property
+    def directory(self):
+        return Path(self._directory or settings.METRICS_DIR)
+
+    @property
+    def filename(self):
+        pid = os.getpid()
+        if self.process is None or self.process[0] != pid:
+            self.process = (pid, f'{pid}-{process_start(pid)}.json')
+        return self.process[1]
+
+    def _inc(self, name, labels, amount):
+        key = (name, labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def _observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [0] * (len(buckets) + 2)
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+    def record(self, view, method, status, duration, queries, query_time,
+               size=None):
+        labels = (('view', view), ('method', method))
+        with self.lock:
+            self._inc(
+                'foodgram_http_requests_total',
+                labels + (('status', str(status)),),
+                1,
+            )
+            self._observe(
+                'foodgram_http_request_duration_seconds', labels, duration
+            )
+            self._observe('foodgram_db_queries', labels, queries)
+            self._inc(
+                'foodgram_db_query_duration_seconds_total', labels, query_time
+            )
+            if size is not None:
+                self._observe(
+                    'foodgram_http_response_size_bytes', labels, size
+                )
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if time.monotonic() - self.flushed_at >= interval:
+            self.flush()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                self.flushed_at = time.monotonic()
+                if not self.values:
+                    return
+                snapshot = json.dumps([
+                    [name, labels, value]
+                    for (name, labels), value in self.values.items()
+                ])
+            directory = self.directory
+            directory.mkdir(parents=True, exist_ok=True)
+            write_snapshot(directory, self.filename, snapshot)
+
+    def retire(self, paths):
+        directory = self.directory
+        with open(directory / '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired = merge({}, read_snapshot(directory / RETIRED) or [])
+            for path in paths:
+                merge(retired, read_snapshot(path) or [])
+            write_snapshot(directory, RETIRED, json.dumps([
+                [name, labels, value]
+                for (name, labels), value in retired.items()
+            ]))
+            for path in paths:
+                path.unlink(missing_ok=True)
+
+    def collect(self):
+        self.flush()
+        live, dead = [], []
+        for path in self.directory.glob('*.json'):
+            pid, _, started = path.stem.partition('-')
+            if not pid.isdigit():
+                continue
+            if is_running(int(pid), started):
+                live.append(path)
+            else:
+                dead.append(path)
+        if dead:
+            self.retire(dead)
+        totals = {}
+        for path in [*live, self.directory / RETIRED]:
+            merge(totals, read_snapshot(path) or [])
+        return totals
+
+    def render(self):
+        series = {}
+        for (name, labels), value in sorted(self.collect().items()):
+            series.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in series.get(name, []):
+                if kind == COUNTER:
+                    lines.append(
+                        f'{name}{format_labels(labels)} {format_value(value)}'
+                    )
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), value[:-1]):
+                    cumulative += count
+                    bucket_labels = labels + (('le', format_value(bound)),)
+                    lines.append(
+                        f'{name}_bucket{format_labels(bucket_labels)} '
+                        f'{cumulative}'
+                    )
+                lines.append(
+                    f'{name}_sum{format_labels(labels)} '
+                    f'{format_value(value[-1])}'
+                )
+                lines.append(
+                    f'{name}_count{format_labels(labels)} {cumulative}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
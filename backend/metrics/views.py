@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .registry import CONTENT_TYPE, registry
+
+
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {token}'
+        ):
+            return HttpResponseForbidden()
+    elif not request.user.is_staff:
+        raise Http404
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+
+
+metrics.metrics_exempt = True
@@ -1,3 +1,5 @@
+from functools import partial
+
 from django.contrib import admin
 
 from .models import (
@@ -6,7 +8,8 @@ from .models import (
     Recipe,
     RecipeIngredient,
     FavoriteRecipe,
-    ShoppingCart
+    ShoppingCart,
+    ShoppingListItem,
 )
 
 
@@ -37,7 +40,7 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = (
         'name',
         'author',
-        'get_favorite_count',
+        'favorites_count',
     )
     search_fields = (
         'name',
@@ -49,10 +52,14 @@ class RecipeAdmin(admin.ModelAdmin):
     filter_horizontal = (
         'tags',
     )
+    readonly_fields = (
+        'favorites_count',
+        'updated_at',
+    )
 
-    def get_favorite_count(self, obj):
-        return obj.favorites.count()
-    get_favorite_count.short_description = 'Добавлений в избранное'
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        Recipe.objects.filter(pk=form.instance.pk).update_search_vector()
 
 
 @admin.register(RecipeIngredient)
@@ -62,6 +69,34 @@ class RecipeIngredientAdmin(admin.ModelAdmin):
         'amount',
     )
 
+    def update_recipes(self, recipe_ids, change):
+        recipes = Recipe.objects.filter(pk__in=recipe_ids)
+        for recipe in recipes:
+            ShoppingListItem.objects.remove_recipe(recipe)
+        change()
+        for recipe in recipes:
+            ShoppingListItem.objects.add_recipe(recipe)
+        recipes.update_search_vector()
+        recipes.touch()
+
+    def save_model(self, request, obj, form, change):
+        self.update_recipes(
+            {obj.recipe_id, form.initial.get('recipe')},
+            partial(super().save_model, request, obj, form, change),
+        )
+
+    def delete_model(self, request, obj):
+        self.update_recipes(
+            {obj.recipe_id},
+            partial(super().delete_model, request, obj),
+        )
+
+    def delete_queryset(self, request, queryset):
+        self.update_recipes(
+            set(queryset.values_list('recipe_id', flat=True)),
+            partial(super().delete_queryset, request, queryset),
+        )
+
 
 @admin.register(FavoriteRecipe)
 class FavoriteRecipeAdmin(admin.ModelAdmin):
@@ -77,3 +112,33 @@ class ShoppingCartAdmin(admin.ModelAdmin):
         'user',
         'recipe',
     )
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            old = ShoppingCart.objects.select_related(
+                'user', 'recipe'
+            ).get(pk=obj.pk)
+            ShoppingListItem.objects.remove_recipe(old.recipe, old.user)
+        super().save_model(request, obj, form, change)
+        ShoppingListItem.objects.add_recipe(obj.recipe, obj.user)
+
+    def delete_model(self, request, obj):
+        ShoppingListItem.objects.remove_recipe(obj.recipe, obj.user)
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for cart in queryset.select_related('user', 'recipe'):
+            ShoppingListItem.objects.remove_recipe(cart.recipe, cart.user)
+        super().delete_queryset(request, queryset)
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'ingredient',
+        'amount',
+    )
+    list_select_related = (
+        'ingredient',
+    )
@@ -0,0 +1,73 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from core.constants import (
+    RECIPE_IMAGE_FORMATS,
+    RECIPE_IMAGE_SIZES,
+    RECIPE_IMAGE_VARIANTS_DIR,
+)
+from .models import Recipe
+
+
+def get_formats():
+    return [
+        (image_format, extension)
+        for image_format, extension in RECIPE_IMAGE_FORMATS
+        if image_format == 'JPEG' or features.check(image_format.lower())
+    ]
+
+
+def render_variant(image, size, image_format):
+    variant = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    variant.save(buffer, image_format, quality=80)
+    return buffer.getvalue()
+
+
+def delete_variants(variants):
+    for name, formats in variants.items():
+        if name == 'source':
+            continue
+        for path in formats.values():
+            default_storage.delete(path)
+
+
+def generate_image_variants(recipe_id):
+    recipe = Recipe.objects.only('image').get(pk=recipe_id)
+    source = recipe.image.name
+    stem = PurePosixPath(source).stem
+    variants = {'source': source}
+    with recipe.image.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    for name, size in RECIPE_IMAGE_SIZES.items():
+        variants[name] = {}
+        for image_format, extension in get_formats():
+            path = f'{RECIPE_IMAGE_VARIANTS_DIR}{stem}_{name}.{extension}'
+            path = default_storage.save(
+                path,
+                ContentFile(render_variant(image, size, image_format)),
+            )
+            default_storage.acquire(path)
+            variants[name][extension] = path
+    with transaction.atomic():
+        previous = Recipe.objects.select_for_update().filter(
+            pk=recipe_id, image=source
+        ).values_list('image_variants', flat=True).first()
+        if previous is None:
+            delete_variants(variants)
+        else:
+            Recipe.objects.filter(pk=recipe_id).update(
+                image_variants=variants,
+                updated_at=timezone.now(),
+            )
+            delete_variants(previous)
+    return variants
@@ -0,0 +1,55 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+
+from recipes.images import generate_image_variants
+from recipes.models import Recipe
+
+
+def process(recipe_id):
+    try:
+        generate_image_variants(recipe_id)
+        return recipe_id, None
+    except Exception as error:
+        return recipe_id, str(error)
+
+
+class Command(BaseCommand):
+    help = 'Генерирует миниатюры и WebP/AVIF-варианты изображений рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать варианты для всех рецептов',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['force']:
+            recipes = recipes.annotate(
+                source=KT('image_variants__source')
+            ).filter(Q(source__isnull=True) | ~Q(source=F('image')))
+        recipe_ids = list(recipes.values_list('id', flat=True))
+        connections.close_all()
+
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for recipe_id, error in pool.map(process, recipe_ids):
+                if error:
+                    failed += 1
+                    self.stderr.write(f'Рецепт {recipe_id}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано рецептов: {len(recipe_ids) - failed}, '
+            f'ошибок: {failed}'
+        ))
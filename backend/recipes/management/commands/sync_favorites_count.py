@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счетчики избранного рецептов с таблицей избранного'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не исправляя счетчики',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = Recipe.objects.with_favorites_count_drift().count()
+            if mismatches:
+                raise CommandError(f'Найдено расхождений: {mismatches}')
+        else:
+            repaired = Recipe.objects.sync_favorites_count()
+            self.stdout.write(f'Исправлено счетчиков: {repaired}')
+        self.stdout.write(
+            self.style.SUCCESS('Счетчики избранного согласованы')
+        )
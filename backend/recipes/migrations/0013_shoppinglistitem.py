@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0012_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingListItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField(verbose_name='Количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='recipes.ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Список покупок',
+                'verbose_name_plural': 'Списки покупок',
+                'unique_together': {('user', 'ingredient')},
+            },
+        ),
+        migrations.RunSQL(
+            '''
+            INSERT INTO recipes_shoppinglistitem (user_id, ingredient_id, amount)
+            SELECT c.user_id, ri.ingredient_id, SUM(ri.amount)
+            FROM recipes_shoppingcart AS c
+            JOIN recipes_recipeingredient AS ri ON ri.recipe_id = c.recipe_id
+            GROUP BY c.user_id, ri.ingredient_id
+            ''',
+            migrations.RunSQL.noop,
+        ),
+    ]
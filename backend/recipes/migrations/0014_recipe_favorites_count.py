@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Добавлений в избранное'),
+        ),
+        migrations.RunSQL(
+            '''
+            UPDATE recipes_recipe AS r
+            SET favorites_count = f.count
+            FROM (
+                SELECT recipe_id, COUNT(*) AS count
+                FROM recipes_favoriterecipe
+                GROUP BY recipe_id
+            ) AS f
+            WHERE f.recipe_id = r.id
+            ''',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_popularity_idx'),
+        ),
+    ]
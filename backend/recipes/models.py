@@ -1,11 +1,32 @@
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Value,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 from core.constants import (
     MINIMUM_VALUES,
     MAXIMUM_VALUES,
+    SEARCH_CONFIG,
 )
+from users.models import Subscription
 
 User = get_user_model()
 
@@ -49,6 +70,176 @@ class Ingredient(models.Model):
         return self.name
 
 
+def get_catalog_version_key(name):
+    return f'catalog-version:{name}'
+
+
+class CatalogVersionManager(models.Manager):
+    def bump(self, model):
+        name = model._meta.label_lower
+        updated = self.filter(name=name).update(
+            version=models.F('version') + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            self.get_or_create(name=name)
+        transaction.on_commit(partial(self.refresh, name))
+
+    def refresh(self, name):
+        catalog = self.filter(name=name).first()
+        if catalog is not None:
+            cache.set(
+                get_catalog_version_key(name),
+                catalog,
+                settings.CATALOG_VERSION_CACHE_TTL,
+            )
+        return catalog
+
+    def get_for_model(self, model):
+        name = model._meta.label_lower
+        catalog = cache.get(get_catalog_version_key(name))
+        if catalog is None:
+            catalog = self.refresh(name)
+        return catalog
+
+    async def aget_for_model(self, model):
+        name = model._meta.label_lower
+        catalog = await cache.aget(get_catalog_version_key(name))
+        if catalog is None:
+            catalog = await self.filter(name=name).afirst()
+            if catalog is not None:
+                await cache.aset(
+                    get_catalog_version_key(name),
+                    catalog,
+                    settings.CATALOG_VERSION_CACHE_TTL,
+                )
+        return catalog
+
+
+class CatalogVersion(models.Model):
+    name = models.CharField(
+        'Справочник',
+        max_length=64,
+        unique=True
+    )
+    version = models.PositiveBigIntegerField(
+        'Версия',
+        default=1
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+
+    objects = CatalogVersionManager()
+
+    class Meta:
+        verbose_name = 'Версия справочника'
+        verbose_name_plural = 'Версии справочников'
+
+    def __str__(self):
+        return f'{self.name} v{self.version}'
+
+
+class RecipeQuerySet(models.QuerySet):
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                FavoriteRecipe.objects.filter(
+                    user=user,
+                    recipe=OuterRef('pk'),
+                )
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(
+                    user=user,
+                    recipe=OuterRef('pk'),
+                )
+            ),
+        )
+
+    def with_author_subscription(self, user):
+        if user.is_anonymous:
+            return self.annotate(author_is_subscribed=Value(False))
+        return self.annotate(
+            author_is_subscribed=Exists(
+                Subscription.objects.filter(
+                    user=user,
+                    author=OuterRef('author'),
+                )
+            )
+        )
+
+    def with_tags_version(self):
+        return self.annotate(
+            tags_version=Subquery(
+                CatalogVersion.objects.filter(
+                    name=Tag._meta.label_lower
+                ).values('version')
+            ),
+        )
+
+    def with_tag_ids(self):
+        return self.annotate(
+            tag_ids=ArraySubquery(
+                Recipe.tags.through.objects.filter(
+                    recipe=OuterRef('pk')
+                ).order_by('pk').values('tag_id')
+            ),
+        ).with_tags_version()
+
+    def for_reading(self, user):
+        return self.with_user_flags(user).with_author_subscription(
+            user
+        ).with_tag_ids().select_related('author')
+
+    def touch(self):
+        return self.update(updated_at=timezone.now())
+
+    def update_search_vector(self):
+        ingredient_names = RecipeIngredient.objects.filter(
+            recipe=OuterRef('pk')
+        ).values('recipe').annotate(
+            names=StringAgg('ingredient__name', ' ')
+        ).values('names')
+        return self.update(
+            search_vector=(
+                SearchVector('name', weight='A', config=SEARCH_CONFIG)
+                + SearchVector(
+                    Subquery(ingredient_names),
+                    weight='B',
+                    config=SEARCH_CONFIG,
+                )
+                + SearchVector('text', weight='C', config=SEARCH_CONFIG)
+            )
+        )
+
+    def _actual_favorites_count(self):
+        return Coalesce(
+            Subquery(
+                FavoriteRecipe.objects.filter(
+                    recipe=OuterRef('pk')
+                ).values('recipe').annotate(
+                    count=Count('pk')
+                ).values('count')
+            ),
+            0,
+        )
+
+    def with_favorites_count_drift(self):
+        return self.exclude(favorites_count=self._actual_favorites_count())
+
+    def sync_favorites_count(self):
+        return self.with_favorites_count_drift().update(
+            favorites_count=self._actual_favorites_count()
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -64,6 +255,12 @@ class Recipe(models.Model):
         'Изображение',
         upload_to='recipes_images/'
     )
+    image_variants = models.JSONField(
+        'Варианты изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(
         'Описание рецепта'
     )
@@ -85,11 +282,41 @@ class Recipe(models.Model):
             MaxValueValidator(MAXIMUM_VALUES),
         ]
     )
+    favorites_count = models.PositiveIntegerField(
+        'Добавлений в избранное',
+        default=0,
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_popularity_idx',
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx',
+            ),
+            GinIndex(
+                fields=['name'],
+                name='recipe_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -125,6 +352,22 @@ class RecipeIngredient(models.Model):
         )
 
 
+def prefetch_recipe_relations(recipes):
+    prefetch_related_objects(
+        recipes,
+        Prefetch(
+            'recipeingredient_set',
+            queryset=RecipeIngredient.objects.select_related('ingredient'),
+        ),
+    )
+    without_catalog = [
+        recipe for recipe in recipes
+        if getattr(recipe, 'tags_version', None) is None
+    ]
+    if without_catalog:
+        prefetch_related_objects(without_catalog, 'tags')
+
+
 class FavoriteRecipe(models.Model):
     user = models.ForeignKey(
         User,
@@ -169,3 +412,126 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user} добавил в корзину {self.recipe}'
+
+
+class ShoppingListManager(models.Manager):
+    def _execute(self, sql, params=(), **kwargs):
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(
+                items=self.model._meta.db_table,
+                cart=ShoppingCart._meta.db_table,
+                recipe_ingredients=RecipeIngredient._meta.db_table,
+                **kwargs,
+            ), params)
+            if cursor.description:
+                return cursor.fetchone()[0]
+            return cursor.rowcount
+
+    def _cart_condition(self, recipe, user):
+        if user is None:
+            return 'c.recipe_id = %s', [recipe.pk]
+        return 'c.recipe_id = %s AND c.user_id = %s', [recipe.pk, user.pk]
+
+    def add_recipe(self, recipe, user=None):
+        condition, params = self._cart_condition(recipe, user)
+        self._execute(
+            '''
+            INSERT INTO {items} (user_id, ingredient_id, amount)
+            SELECT c.user_id, ri.ingredient_id, SUM(ri.amount)
+            FROM {cart} AS c
+            JOIN {recipe_ingredients} AS ri ON ri.recipe_id = c.recipe_id
+            WHERE {condition}
+            GROUP BY c.user_id, ri.ingredient_id
+            ON CONFLICT (user_id, ingredient_id)
+            DO UPDATE SET amount = {items}.amount + EXCLUDED.amount
+            ''',
+            params,
+            condition=condition,
+        )
+
+    def remove_recipe(self, recipe, user=None):
+        condition, params = self._cart_condition(recipe, user)
+        self._execute(
+            '''
+            WITH d AS (
+                SELECT c.user_id, ri.ingredient_id, SUM(ri.amount) AS amount
+                FROM {cart} AS c
+                JOIN {recipe_ingredients} AS ri
+                    ON ri.recipe_id = c.recipe_id
+                WHERE {condition}
+                GROUP BY c.user_id, ri.ingredient_id
+            ), deleted AS (
+                DELETE FROM {items} AS i
+                USING d
+                WHERE i.user_id = d.user_id
+                    AND i.ingredient_id = d.ingredient_id
+                    AND i.amount <= d.amount
+            )
+            UPDATE {items} AS i
+            SET amount = i.amount - d.amount
+            FROM d
+            WHERE i.user_id = d.user_id
+                AND i.ingredient_id = d.ingredient_id
+                AND i.amount > d.amount
+            ''',
+            params,
+            condition=condition,
+        )
+
+    def rebuild(self):
+        self.all().delete()
+        return self._execute(
+            '''
+            INSERT INTO {items} (user_id, ingredient_id, amount)
+            SELECT c.user_id, ri.ingredient_id, SUM(ri.amount)
+            FROM {cart} AS c
+            JOIN {recipe_ingredients} AS ri ON ri.recipe_id = c.recipe_id
+            GROUP BY c.user_id, ri.ingredient_id
+            '''
+        )
+
+    def count_mismatches(self):
+        return self._execute(
+            '''
+            SELECT COUNT(*)
+            FROM {items} AS i
+            FULL OUTER JOIN (
+                SELECT c.user_id, ri.ingredient_id, SUM(ri.amount) AS amount
+                FROM {cart} AS c
+                JOIN {recipe_ingredients} AS ri ON ri.recipe_id = c.recipe_id
+                GROUP BY c.user_id, ri.ingredient_id
+            ) AS e
+                ON e.user_id = i.user_id AND e.ingredient_id = i.ingredient_id
+            WHERE i.amount IS DISTINCT FROM e.amount
+            '''
+        )
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент'
+    )
+    amount = models.PositiveIntegerField(
+        'Количество'
+    )
+
+    objects = ShoppingListManager()
+
+    class Meta:
+        verbose_name = 'Список покупок'
+        verbose_name_plural = 'Списки покупок'
+        unique_together = ('user', 'ingredient')
+
+    def __str__(self):
+        return (
+            f'{self.user}: {self.ingredient.name} - '
+            f'{self.amount} {self.ingredient.measurement_unit}'
+        )
@@ -0,0 +1,70 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .images import delete_variants
+from .models import (
+    CatalogVersion,
+    Ingredient,
+    Recipe,
+    ShoppingListItem,
+    Tag,
+    User,
+)
+from .tasks import generate_recipe_image_variants
+
+
+@receiver(post_save, sender=Ingredient)
+def update_recipes_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        recipes = Recipe.objects.filter(ingredients=instance)
+        recipes.update_search_vector()
+        recipes.touch()
+
+
+@receiver(pre_delete, sender=Ingredient)
+def touch_recipes_before_ingredient_delete(sender, instance, **kwargs):
+    Recipe.objects.filter(ingredients=instance).touch()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def bump_catalog_version(sender, **kwargs):
+    CatalogVersion.objects.bump(sender)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_from_shopping_lists(sender, instance, **kwargs):
+    ShoppingListItem.objects.remove_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def increase_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def decrease_recipes_count(sender, instance, **kwargs):
+    User.objects.filter(pk=instance.author_id).update(
+        recipes_count=Greatest(F('recipes_count') - 1, 0)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def generate_image_variants(sender, instance, **kwargs):
+    source = instance.image_variants.get('source')
+    if instance.image and instance.image.name != source:
+        generate_recipe_image_variants.enqueue(
+            recipe_id=instance.pk, source=instance.image.name
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_image_variants(sender, instance, **kwargs):
+    delete_variants(instance.image_variants)
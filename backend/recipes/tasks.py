@@ -0,0 +1,9 @@
+from jobs.queue import task
+from .images import generate_image_variants
+from .models import Recipe
+
+
+@task('recipes.generate_image_variants', max_attempts=3)
+def generate_recipe_image_variants(recipe_id, source):
+    if Recipe.objects.filter(pk=recipe_id, image=source).exists():
+        generate_image_variants(recipe_id)
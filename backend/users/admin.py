@@ -30,6 +30,7 @@ class UserAdmin(admin.ModelAdmin):
     readonly_fields = (
         'last_login',
         'date_joined',
+        'recipes_count',
     )
 
 
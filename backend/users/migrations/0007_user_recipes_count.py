@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-17 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_alter_user_options'),
+        ('recipes', '0014_recipe_favorites_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество рецептов'),
+        ),
+        migrations.RunSQL(
+            '''
+            UPDATE users_user AS u
+            SET recipes_count = r.count
+            FROM (
+                SELECT author_id, COUNT(*) AS count
+                FROM recipes_recipe
+                GROUP BY author_id
+            ) AS r
+            WHERE r.author_id = u.id
+            ''',
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -22,6 +22,10 @@ class User(AbstractUser):
         blank=True,
         upload_to='users_avatars/'
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = [
@@ -37,6 +41,19 @@ class User(AbstractUser):
     def __str__(self):
         return f'{self.username}'
 
+    def save(self, *args, **kwargs):
+        # recipes_count меняют только сигналы рецептов через F(), поэтому
+        # обычное сохранение загруженного ранее пользователя его не пишет.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name != 'recipes_count'
+            ]
+        super().save(*args, **kwargs)
+
 
 class Subscription(models.Model):
     user = models.ForeignKey(
@@ -0,0 +1,33 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.constants import AVATAR_SIZE
+from jobs.queue import task
+from .models import User
+
+
+@task('users.process_avatar')
+def process_avatar(user_id, name):
+    user = User.objects.filter(pk=user_id).only('avatar').first()
+    if user is None or user.avatar.name != name:
+        return
+    try:
+        with user.avatar.open('rb') as file:
+            image = ImageOps.exif_transpose(Image.open(file))
+            image.load()
+    except UnidentifiedImageError:
+        if User.objects.filter(pk=user_id, avatar=name).update(avatar=None):
+            default_storage.delete(name)
+        return
+    image.thumbnail(AVATAR_SIZE, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    processed = default_storage.save(name, ContentFile(buffer.getvalue()))
+    default_storage.acquire(processed)
+    updated = User.objects.filter(pk=user_id, avatar=name).update(
+        avatar=processed
+    )
+    default_storage.delete(name if updated else processed)